@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import Annotated, List
+
+# Core
+from app.core.db.session import get_session, get_read_session, run_db
+from app.core.security import require_admin, bearer_scheme
+
+# Schemas & CRUD
+from app.schemas.user import UserPrincipal
+from app.schemas.alert import AlertFilter, StockAlertResponse, StockThresholdResponse, StockThresholdSet
+from app.crud.alert import delete_threshold, get_alerts, get_thresholds, set_threshold
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+common_responses = {
+    status.HTTP_401_UNAUTHORIZED: {
+        "description": "No autorizado - Token inválido o expirado",
+        "headers": {"WWW-Authenticate": "Bearer"},
+    },
+    status.HTTP_403_FORBIDDEN: {"description": "Prohibido - No tienes permisos suficientes"},
+    status.HTTP_404_NOT_FOUND: {"description": "Umbral no encontrado"},
+}
+
+
+@router.get(
+    "/",
+    response_model=List[StockAlertResponse],
+    summary="Alertas de existencias bajas",
+    description="Pares (almacén, insumo) que están por debajo de su existencia mínima. `notified_at` indica si ya se incluyeron en un correo de resumen. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_alerts(
+    filters: Annotated[AlertFilter, Query()],
+    db: Session = Depends(get_read_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, get_alerts, filters)
+
+
+@router.get(
+    "/thresholds",
+    response_model=List[StockThresholdResponse],
+    summary="Existencias mínimas",
+    description="Existencia mínima configurada por (almacén, insumo). Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_thresholds(
+    filters: Annotated[AlertFilter, Query()],
+    db: Session = Depends(get_read_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, get_thresholds, filters)
+
+
+@router.put(
+    "/thresholds",
+    response_model=StockThresholdResponse,
+    summary="Definir existencia mínima",
+    description="Crea o actualiza la existencia mínima de un (almacén, insumo) y revisa su alerta al momento. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def set_threshold_endpoint(
+    threshold: StockThresholdSet,
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, set_threshold, threshold)
+
+
+@router.delete(
+    "/thresholds/{warehouse_id}/{input_id}",
+    response_model=StockThresholdResponse,
+    summary="Eliminar existencia mínima",
+    description="Elimina la existencia mínima de un (almacén, insumo) y su alerta activa. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def delete_threshold_endpoint(
+    warehouse_id: int,
+    input_id: int,
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, delete_threshold, warehouse_id, input_id)
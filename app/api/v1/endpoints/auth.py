@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.db.session import get_db
+from app.core.db.session import get_session, run_db
 from app.crud.user import (
     get_user_by_username,
+    update_password_hash,
 )
 from app.core.security import (
     create_access_token,
-    verify_password,
+    token_claims,
+    verify_password_async,
     get_current_user,
 )
 from app.schemas.user import UserLogin, Token, UserResponse
@@ -17,8 +19,8 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 # Ruta para autenticación y generación de token
 @router.post("/login", response_model=Token)
-def login_for_access_token(user_data: UserLogin, db: Session = Depends(get_db)):
-    user = get_user_by_username(db, user_data.name)
+async def login_for_access_token(user_data: UserLogin, db: Session = Depends(get_session)):
+    user = await run_db(db, get_user_by_username, user_data.name)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,7 +33,8 @@ def login_for_access_token(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="La contraseña del usuario es obligatoria.",
         )
 
-    if not verify_password(user_data.password, user.password):
+    verified, new_hash = await verify_password_async(user_data.password, user.password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas. Verifica tu nombre de usuario y contraseña.",
@@ -40,9 +43,13 @@ def login_for_access_token(user_data: UserLogin, db: Session = Depends(get_db)):
 
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
-        data={"sub": user.name}, expires_delta=access_token_expires
+        data=token_claims(user), expires_delta=access_token_expires
     )
 
+    # passlib indica que el hash usa parámetros obsoletos: se guarda el nuevo
+    if new_hash:
+        await run_db(db, update_password_hash, user.id, new_hash)
+
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Annotated, List
 
 # Core
-from app.core.db.session import get_db
-from app.core.security import get_current_user, bearer_scheme
+from app.core.csv_import import import_csv
+from app.core.db.config import settings
+from app.core.db.session import get_session, get_read_session, run_db
+from app.core.security import require_admin, bearer_scheme
+from app.core.conditional import conditional_get, make_etag
+from app.core.serialization import item_response, list_response
+from app.core.response_cache import response_cache
 
 # Schemas & CRUD
-from app.schemas.input import InputCreate, InputUpdate, InputResponse
+from app.schemas.csv_import import CsvImportResult
+from app.schemas.user import UserPrincipal
+from app.schemas.input import InputCreate, InputUpdate, InputResponse, InputFilter, InputFields
 from app.crud.input import (
     get_inputs,
+    get_inputs_version,
+    get_input_catalog_version,
     get_input,
     create_input,
+    import_inputs,
     update_input,
     delete_input
 )
@@ -29,29 +39,41 @@ common_responses = {
 }
 
 
-def verify_admin(current_user):
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permisos para esta acción",
-        )
-
-
 @router.get(
     "/",
     response_model=List[InputResponse],
     summary="Obtener todos los insumos",
-    description="Lista todos los insumos registrados. Requiere autenticación JWT.",
+    description="Lista paginada de insumos, filtrable por prefijo del nombre. Si hay más resultados, el cursor de la siguiente página se devuelve en el header X-Next-Cursor. Requiere autenticación JWT.",
     dependencies=[Depends(bearer_scheme)],
     responses={**common_responses},
 )
 async def read_inputs(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    filters: Annotated[InputFilter, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    return get_inputs(db)
+    # La versión del catálogo se comparte entre workers: una escritura en otro worker cambia la clave
+    catalog_version = await run_db(db, get_input_catalog_version)
+    cache_key, cached = await response_cache.get(
+        request, current_user, "inputs", ("input",), versions=(catalog_version,)
+    )
+    if cached:
+        return cached
+
+    count, last_modified = await run_db(db, get_inputs_version, filters)
+    etag = make_etag("inputs", count, last_modified, str(request.query_params))
+    if not_modified := conditional_get(request, response, etag, last_modified):
+        return not_modified
+
+    items, next_cursor = await run_db(db, get_inputs, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return await response_cache.put(
+        "inputs", cache_key, list_response(InputResponse, items, response, fields=filters.field_names, render=response_cache.enabled)
+    )
 
 
 @router.get(
@@ -64,15 +86,20 @@ async def read_inputs(
 )
 async def read_input(
     input_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    params: Annotated[InputFields, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    db_input = get_input(db, input_id)
+    db_input = await run_db(db, get_input, input_id)
     if not db_input:
         raise HTTPException(status_code=404, detail="Insumo no encontrado")
-    return db_input
+    etag = make_etag("input", db_input.id, db_input.updated_at, str(request.query_params))
+    if not_modified := conditional_get(request, response, etag, db_input.updated_at):
+        return not_modified
+    return item_response(InputResponse, db_input, params.field_names, response)
 
 
 @router.post(
@@ -86,12 +113,28 @@ async def read_input(
 )
 async def create_input_endpoint(
     input_data: InputCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, create_input, input_data)
+
+
+@router.post(
+    "/import",
+    response_model=CsvImportResult,
+    summary="Importar insumos desde CSV",
+    description="Carga masiva desde un archivo CSV (UTF-8) con cabecera `name, reference, state`. Inserta los insumos nuevos y actualiza los existentes por nombre, por bloques de IMPORT_CHUNK_SIZE filas en transacciones separadas. Devuelve el número de filas creadas y actualizadas y el error de cada fila rechazada. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def import_inputs_endpoint(
+    file: UploadFile = File(..., description="Archivo CSV"),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    return create_input(db, input_data)
+    return await import_csv(file, InputCreate, db, import_inputs, settings.IMPORT_CHUNK_SIZE)
 
 
 @router.put(
@@ -105,12 +148,11 @@ async def create_input_endpoint(
 async def update_input_endpoint(
     input_id: int,
     input_data: InputUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    updated_input = update_input(db, input_id, input_data)
+    updated_input = await run_db(db, update_input, input_id, input_data)
     if not updated_input:
         raise HTTPException(status_code=404, detail="Insumo no encontrado")
     return updated_input
@@ -126,12 +168,11 @@ async def update_input_endpoint(
 )
 async def delete_input_endpoint(
     input_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    db_input = delete_input(db, input_id)
+    db_input = await run_db(db, delete_input, input_id)
     if not db_input:
         raise HTTPException(status_code=404, detail="Insumo no encontrado")
     return db_input
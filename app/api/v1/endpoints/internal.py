@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+
+# Core
+from app.core.cache import caches
+from app.core.db.pool import pool_status
+from app.core.db.session import engine, async_engine, replica_router, get_session, run_db
+from app.core.security import require_admin, bearer_scheme, password_pool
+from app.core.response_cache import response_cache
+from app.crud.outbox import outbox_status
+from app.schemas.user import UserPrincipal
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+common_responses = {
+    status.HTTP_401_UNAUTHORIZED: {
+        "description": "No autorizado - Token inválido o expirado",
+        "headers": {"WWW-Authenticate": "Bearer"},
+    },
+    status.HTTP_403_FORBIDDEN: {"description": "Prohibido - No tienes permisos suficientes"},
+}
+
+
+@router.get(
+    "/db-pool",
+    summary="Estado del pool de conexiones",
+    description="Conexiones en uso, overflow e histograma de espera por conexión. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_db_pool(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine) if async_engine is not None else None,
+        "replicas": [
+            {**replica, "pool": pool_status(r.engine)}
+            for r, replica in zip(replica_router.replicas, replica_router.status())
+        ],
+    }
+
+
+@router.get(
+    "/caches",
+    summary="Estadísticas de las cachés en memoria",
+    description="Tamaño, aciertos, fallos y expulsiones de cada caché del proceso. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_caches(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+@router.get(
+    "/response-cache",
+    summary="Estadísticas de la caché de respuestas",
+    description="Almacén usado y, por ruta, aciertos, fallos, proporción de aciertos y bytes guardados y servidos desde la caché. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_response_cache(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return response_cache.stats()
+
+
+@router.get(
+    "/password-pool",
+    summary="Estado del pool de hashing de contraseñas",
+    description="Hilos, trabajos en cola/en curso y rechazados del pool de bcrypt. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_password_pool(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return password_pool.stats()
+
+
+@router.get(
+    "/outbox",
+    summary="Estado del outbox de correos",
+    description="Correos pendientes, correos descartados tras agotar los reintentos y antigüedad del pendiente más viejo. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_outbox(
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, outbox_status)
@@ -1,18 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Annotated, List
 
 # Core
-from app.core.db.session import get_db
-from app.core.security import get_current_user, bearer_scheme
+from app.core.db.config import settings
+from app.core.conditional import conditional_get, make_etag
+from app.core.db.session import get_session, get_read_session, run_db, stream_rows
+from app.core.export import csv_chunks, ndjson_chunks
+from app.core.security import require_admin, bearer_scheme
+from app.core.serialization import item_response, list_response
+from app.core.response_cache import response_cache
 
 # Schemas & CRUD
-from app.schemas.inventory import InventoryCreate, InventoryUpdate, InventoryResponse
+from app.schemas.user import UserPrincipal
+from app.schemas.inventory import (
+    InventoryCreate,
+    InventoryBatch,
+    InventoryBatchResult,
+    InventoryUpdate,
+    InventoryResponse,
+    InventoryDetail,
+    InventoryExpandedResponse,
+    InventoryFilter,
+    InventoryExport,
+    BalanceFilter,
+    StockBalance,
+)
 from app.crud.inventory import (
+    EXPORT_COLUMNS,
+    export_inventories_statement,
+    get_balances,
     get_inventories,
+    get_inventories_version,
     get_inventory,
+    get_inventory_version,
     create_inventory,
+    create_inventories,
     update_inventory,
     delete_inventory,
 )
@@ -29,50 +54,121 @@ common_responses = {
 }
 
 
-def verify_admin(current_user):
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permisos para esta acción",
-        )
-
-
 @router.get(
     "/",
-    response_model=List[InventoryResponse],
+    response_model=List[InventoryExpandedResponse],
+    response_model_exclude_unset=True,
     summary="Obtener todo el inventario",
-    description="Lista todos los registros de inventario. Requiere autenticación JWT.",
+    description="Lista paginada de registros de inventario, filtrable por almacén, insumo, usuario, tipo de movimiento y rango de fechas. Con `expand=input,warehouse,user` incluye los objetos relacionados y con `fields` solo los campos indicados. Si hay más resultados, el cursor de la siguiente página se devuelve en el header X-Next-Cursor. Sin relaciones incluidas admite If-None-Match/If-Modified-Since (304). Requiere autenticación JWT.",
     dependencies=[Depends(bearer_scheme)],
     responses={**common_responses},
 )
 async def read_inventories(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    filters: Annotated[InventoryFilter, Query()],
+    db: Session = Depends(get_read_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    # Con relaciones incluidas no hay validación condicional: pueden cambiar sin que cambie el movimiento
+    if not filters.relations:
+        count, last_modified = await run_db(db, get_inventories_version, filters)
+        etag = make_etag("inventories", count, last_modified, str(request.query_params))
+        if not_modified := conditional_get(request, response, etag, last_modified):
+            return not_modified
+
+    items, next_cursor = await run_db(db, get_inventories, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return list_response(InventoryExpandedResponse, items, response, exclude_unset=True, fields=filters.field_names)
+
+
+@router.get(
+    "/export",
+    summary="Exportar movimientos de inventario",
+    description="Descarga en streaming (NDJSON o CSV) todos los movimientos que cumplen los filtros del listado, ordenados por ID. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    response_class=StreamingResponse,
+    responses={
+        **common_responses,
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}, "text/csv": {}}},
+    },
+)
+async def export_inventories(
+    request: Request,
+    filters: Annotated[InventoryExport, Query()],
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    return get_inventories(db)
+    batches = stream_rows(request, export_inventories_statement(filters), settings.EXPORT_BATCH_SIZE)
+    if filters.format == "csv":
+        return StreamingResponse(
+            csv_chunks(EXPORT_COLUMNS, batches),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="inventario.csv"'},
+        )
+    return StreamingResponse(
+        ndjson_chunks(EXPORT_COLUMNS, batches),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="inventario.ndjson"'},
+    )
+
+
+@router.get(
+    "/balance",
+    response_model=List[StockBalance],
+    summary="Existencias por almacén e insumo",
+    description="Suma de entradas menos salidas por (almacén, insumo). Filtrable por almacén e insumo; con `as_of` devuelve las existencias a esa fecha (checkpoint más cercano más los movimientos posteriores). Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_balances(
+    request: Request,
+    filters: Annotated[BalanceFilter, Query()],
+    db: Session = Depends(get_read_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    # Cambia con cada movimiento registrado, editado o eliminado (etiqueta "inventory")
+    cache_key, cached = await response_cache.get(request, current_user, "balance", ("inventory",))
+    if cached:
+        return cached
+    balances = await run_db(db, get_balances, filters)
+    return await response_cache.put(
+        "balance", cache_key, list_response(StockBalance, balances, render=response_cache.enabled)
+    )
 
 
 @router.get(
     "/{inventory_id}",
-    response_model=InventoryResponse,
+    response_model=InventoryExpandedResponse,
+    response_model_exclude_unset=True,
     summary="Obtener inventario por ID",
-    description="Obtiene un registro de inventario por su ID. Requiere autenticación JWT.",
+    description="Obtiene un registro de inventario por su ID. Con `expand=input,warehouse,user` incluye los objetos relacionados y con `fields` solo los campos indicados. Requiere autenticación JWT.",
     dependencies=[Depends(bearer_scheme)],
     responses={**common_responses},
 )
 async def read_inventory(
     inventory_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    params: Annotated[InventoryDetail, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    inventory = get_inventory(db, inventory_id)
+    if not params.relations:
+        updated_at = await run_db(db, get_inventory_version, inventory_id)
+        if updated_at is not None:
+            etag = make_etag("inventory", inventory_id, updated_at, str(request.query_params))
+            if not_modified := conditional_get(request, response, etag, updated_at):
+                return not_modified
+
+    inventory = await run_db(db, get_inventory, inventory_id, params.relations, params.field_names)
     if not inventory:
         raise HTTPException(status_code=404, detail="Registro de inventario no encontrado")
-    return inventory
+    return item_response(InventoryExpandedResponse, inventory, params.field_names, response)
 
 
 @router.post(
@@ -86,31 +182,50 @@ async def read_inventory(
 )
 async def create_inventory_endpoint(
     inventory_data: InventoryCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, create_inventory, inventory_data)
+
+
+@router.post(
+    "/batch",
+    response_model=InventoryBatchResult,
+    summary="Crear registros de inventario por lotes",
+    description="Registra muchos movimientos en una sola transacción y devuelve el resultado de cada uno. Con `mode=all_or_nothing` (por defecto) no se registra ninguno si alguno falla (respuesta 400); con `mode=best_effort` se registran los válidos. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses, status.HTTP_400_BAD_REQUEST: {"model": InventoryBatchResult, "description": "Lote rechazado (all_or_nothing)"}},
+)
+async def create_inventories_endpoint(
+    batch: InventoryBatch,
+    response: Response,
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    return create_inventory(db, inventory_data)
+    result = await run_db(db, create_inventories, batch)
+    if result["failed"] and batch.mode == "all_or_nothing":
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
 
 
 @router.put(
     "/{inventory_id}",
     response_model=InventoryResponse,
     summary="Actualizar un registro de inventario",
-    description="Actualiza un registro de inventario existente. Requiere autenticación JWT.",
+    description="Actualiza un registro de inventario existente. Si solo se envía `quantity`, `amount` se deriva de ella. Requiere autenticación JWT.",
     dependencies=[Depends(bearer_scheme)],
     responses={**common_responses},
 )
 async def update_inventory_endpoint(
     inventory_id: int,
     inventory_data: InventoryUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    updated_inventory = update_inventory(db, inventory_id, inventory_data)
+    updated_inventory = await run_db(db, update_inventory, inventory_id, inventory_data)
     if not updated_inventory:
         raise HTTPException(status_code=404, detail="Registro de inventario no encontrado")
     return updated_inventory
@@ -126,12 +241,11 @@ async def update_inventory_endpoint(
 )
 async def delete_inventory_endpoint(
     inventory_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    inventory = delete_inventory(db, inventory_id)
+    inventory = await run_db(db, delete_inventory, inventory_id)
     if not inventory:
         raise HTTPException(status_code=404, detail="Registro de inventario no encontrado")
     return inventory
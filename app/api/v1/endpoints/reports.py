@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import Annotated, List
+
+# Core
+from app.core.db.session import get_session, get_read_session, run_db
+from app.core.security import require_admin, bearer_scheme
+from app.core.serialization import list_response
+
+# Schemas & CRUD
+from app.schemas.user import UserPrincipal
+from app.schemas.report import (
+    MovementReportFilter,
+    MovementBucket,
+    ForecastFilter,
+    ForecastPair,
+    StockForecastResponse,
+)
+from app.crud.report import get_movement_report
+from app.crud.forecast import get_forecasts, refresh_forecast
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+common_responses = {
+    status.HTTP_401_UNAUTHORIZED: {
+        "description": "No autorizado - Token inválido o expirado",
+        "headers": {"WWW-Authenticate": "Bearer"},
+    },
+    status.HTTP_403_FORBIDDEN: {"description": "Prohibido - No tienes permisos suficientes"},
+}
+
+
+@router.get(
+    "/movements",
+    response_model=List[MovementBucket],
+    summary="Entradas y salidas por periodo",
+    description="Totales de entradas, salidas y neto por día, semana o mes, agrupados por almacén, insumo o ambos y calculados en la base de datos. Opcionalmente incluye el saldo acumulado (`running`) y la media móvil del neto (`moving_average`) de cada serie. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_movement_report(
+    filters: Annotated[MovementReportFilter, Query()],
+    db: Session = Depends(get_read_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return list_response(MovementBucket, await run_db(db, get_movement_report, filters))
+
+
+@router.get(
+    "/forecast",
+    response_model=List[StockForecastResponse],
+    summary="Pronóstico de consumo y días de existencias",
+    description="Consumo medio diario, tendencia y días estimados hasta agotar existencias por (almacén, insumo), a partir de los últimos FORECAST_WINDOW_DAYS días de salidas. Se recalcula cada noche; `computed_at` indica cuándo. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def read_forecasts(
+    filters: Annotated[ForecastFilter, Query()],
+    db: Session = Depends(get_read_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return list_response(StockForecastResponse, await run_db(db, get_forecasts, filters))
+
+
+@router.post(
+    "/forecast/recompute",
+    response_model=StockForecastResponse,
+    summary="Recalcular el pronóstico de un par",
+    description="Recalcula al momento el pronóstico de un (almacén, insumo) sin esperar al cálculo nocturno. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses, status.HTTP_404_NOT_FOUND: {"description": "Sin existencias registradas para el par"}},
+)
+async def recompute_forecast(
+    pair: Annotated[ForecastPair, Query()],
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    forecast = await run_db(db, refresh_forecast, pair.warehouse_id, pair.input_id)
+    if forecast is None:
+        raise HTTPException(status_code=404, detail="No hay existencias registradas para ese almacén e insumo")
+    return forecast
@@ -1,20 +1,18 @@
 # FastAPI Imports
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Annotated, List
 
 # Importación de funciones de la base de datos y seguridad
-from app.core.db.session import get_db
-from app.core.security import get_current_user, bearer_scheme
-from app.core.db.config import settings
+from app.core.db.session import get_session, get_read_session, run_db
+from app.core.security import require_admin, bearer_scheme, hash_password_async
+from app.core.serialization import item_response, list_response
 
 # Importación de funciones de CRUD y esquemas
 from app.crud.user import get_users, get_user, create_user, delete_user, update_user
-from app.schemas.user import UserCreate, UserResponse, UserUpdate
-
-from app.core.email import send_email
+from app.schemas.user import UserCreate, UserResponse, UserUpdate, UserPrincipal, UserFilter, UserFields
 
 # Inicialización del router con el prefijo y las etiquetas correspondientes
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -32,21 +30,12 @@ common_responses = {
 }
 
 
-# 🔹 Función para verificar si el usuario es administrador
-def verify_admin(current_user):
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permisos para esta acción",
-        )
-
-
 @router.get(
     "/",
     dependencies=[Depends(bearer_scheme)],
     response_model=List[UserResponse],
     summary="Obtener todos los usuarios",
-    description="Retorna una lista de todos los usuarios registrados. Requiere autenticación JWT.",
+    description="Retorna una lista paginada de usuarios, filtrable por prefijo del nombre. Si hay más resultados, el cursor de la siguiente página se devuelve en el header X-Next-Cursor. Requiere autenticación JWT.",
     responses={  # Definimos las respuestas de la API
         **common_responses,
         status.HTTP_200_OK: {
@@ -60,9 +49,11 @@ def verify_admin(current_user):
     },
 )
 async def read_users(
-    db: Session = Depends(get_db),
+    response: Response,
+    filters: Annotated[UserFilter, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
     """
     Obtiene todos los usuarios registrados en el sistema.
@@ -73,8 +64,10 @@ async def read_users(
     Retorna:
     - Lista de usuarios en formato JSON
     """
-    verify_admin(current_user)
-    return get_users(db)
+    items, next_cursor = await run_db(db, get_users, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return list_response(UserResponse, items, response, fields=filters.field_names)
 
 
 @router.get(
@@ -93,9 +86,10 @@ async def read_users(
 )
 async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    params: Annotated[UserFields, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
     """
     Obtiene un usuario específico por su ID.
@@ -107,13 +101,12 @@ async def read_user(
     Retorna:
     - El usuario solicitado en formato JSON
     """
-    verify_admin(current_user)
-    user = get_user(db, user_id)
+    user = await run_db(db, get_user, user_id, params.field_names)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
         )
-    return user
+    return item_response(UserResponse, user, params.field_names)
 
 
 @router.post(
@@ -138,9 +131,9 @@ async def read_user(
 )
 async def create_user_endpoint(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
     """
     Crea un nuevo usuario en el sistema.
@@ -151,22 +144,8 @@ async def create_user_endpoint(
     Retorna:
     - El usuario recién creado con su ID
     """
-    verify_admin(current_user)
-
-    new_user = create_user(db, user_data)
-    
-    admin_email = settings.ADMIN_EMAIL
-    email_body = f"""
-    <h2>Nuevo usuario creado</h2>
-    <p><b>Usuario:</b> {user_data.name}</p>
-    <p><b>Contraseña:</b> {user_data.password}</p>
-    """
-
-    await send_email(
-        subject="Nuevo Usuario Creado", recipients=[admin_email], body=email_body
-    )
-
-    return new_user
+    hashed_password = await hash_password_async(user_data.password)
+    return await run_db(db, create_user, user_data, hashed_password)
 
 
 @router.put(
@@ -190,9 +169,9 @@ async def create_user_endpoint(
 async def update_existing_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
     """
     Actualiza los datos de un usuario existente.
@@ -203,10 +182,8 @@ async def update_existing_user(
     Retorna:
     - El usuario actualizado
     """
-    verify_admin(current_user)
-    updated_user = update_user(
-        db, user_id, user_data
-    )
+    hashed_password = await hash_password_async(user_data.password) if user_data.password else None
+    updated_user = await run_db(db, update_user, user_id, user_data, hashed_password)
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
@@ -229,9 +206,9 @@ async def update_existing_user(
 )
 async def delete_user_endpoint(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
     """
     Elimina un usuario del sistema.
@@ -242,8 +219,7 @@ async def delete_user_endpoint(
     Retorna:
     - Respuesta vacía con código HTTP 204
     """
-    verify_admin(current_user)
-    user = delete_user(db, user_id)
+    user = await run_db(db, delete_user, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
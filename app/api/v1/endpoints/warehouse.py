@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Annotated, List
 
 # Core
-from app.core.db.session import get_db
-from app.core.security import get_current_user, bearer_scheme
+from app.core.csv_import import import_csv
+from app.core.db.config import settings
+from app.core.db.session import get_session, get_read_session, run_db
+from app.core.security import require_admin, bearer_scheme
+from app.core.conditional import conditional_get, make_etag
+from app.core.serialization import item_response, list_response
+from app.core.response_cache import response_cache
 
 # Schemas & CRUD
-from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate, WarehouseResponse
+from app.schemas.csv_import import CsvImportResult
+from app.schemas.user import UserPrincipal
+from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate, WarehouseResponse, WarehouseFilter, WarehouseFields
 from app.crud.warehouse import (
     get_warehouses,
+    get_warehouses_version,
+    get_warehouse_catalog_version,
     get_warehouse,
     create_warehouse,
+    import_warehouses,
     update_warehouse,
     delete_warehouse,
 )
@@ -29,29 +39,41 @@ common_responses = {
 }
 
 
-def verify_admin(current_user):
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permisos para esta acción",
-        )
-
-
 @router.get(
     "/",
     response_model=List[WarehouseResponse],
     summary="Obtener todos los almacenes",
-    description="Lista todos los almacenes registrados. Requiere autenticación JWT.",
+    description="Lista paginada de almacenes, filtrable por prefijo del nombre. Si hay más resultados, el cursor de la siguiente página se devuelve en el header X-Next-Cursor. Requiere autenticación JWT.",
     dependencies=[Depends(bearer_scheme)],
     responses={**common_responses},
 )
 async def read_warehouses(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    filters: Annotated[WarehouseFilter, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    return get_warehouses(db)
+    # La versión del catálogo se comparte entre workers: una escritura en otro worker cambia la clave
+    catalog_version = await run_db(db, get_warehouse_catalog_version)
+    cache_key, cached = await response_cache.get(
+        request, current_user, "warehouses", ("warehouse",), versions=(catalog_version,)
+    )
+    if cached:
+        return cached
+
+    count, last_modified = await run_db(db, get_warehouses_version, filters)
+    etag = make_etag("warehouses", count, last_modified, str(request.query_params))
+    if not_modified := conditional_get(request, response, etag, last_modified):
+        return not_modified
+
+    items, next_cursor = await run_db(db, get_warehouses, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return await response_cache.put(
+        "warehouses", cache_key, list_response(WarehouseResponse, items, response, fields=filters.field_names, render=response_cache.enabled)
+    )
 
 
 @router.get(
@@ -64,15 +86,20 @@ async def read_warehouses(
 )
 async def read_warehouse(
     warehouse_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    params: Annotated[WarehouseFields, Query()],
+    db: Session = Depends(get_read_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    warehouse = get_warehouse(db, warehouse_id)
+    warehouse = await run_db(db, get_warehouse, warehouse_id)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Almacén no encontrado")
-    return warehouse
+    etag = make_etag("warehouse", warehouse.id, warehouse.updated_at, str(request.query_params))
+    if not_modified := conditional_get(request, response, etag, warehouse.updated_at):
+        return not_modified
+    return item_response(WarehouseResponse, warehouse, params.field_names, response)
 
 
 @router.post(
@@ -86,12 +113,28 @@ async def read_warehouse(
 )
 async def create_warehouse_endpoint(
     warehouse_data: WarehouseCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    current_user: UserPrincipal = Depends(require_admin),
+):
+    return await run_db(db, create_warehouse, warehouse_data)
+
+
+@router.post(
+    "/import",
+    response_model=CsvImportResult,
+    summary="Importar almacenes desde CSV",
+    description="Carga masiva desde un archivo CSV (UTF-8) con cabecera `name, reference`. Inserta los almacenes nuevos y actualiza los existentes por nombre, por bloques de IMPORT_CHUNK_SIZE filas en transacciones separadas. Devuelve el número de filas creadas y actualizadas y el error de cada fila rechazada. Requiere autenticación JWT.",
+    dependencies=[Depends(bearer_scheme)],
+    responses={**common_responses},
+)
+async def import_warehouses_endpoint(
+    file: UploadFile = File(..., description="Archivo CSV"),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    return create_warehouse(db, warehouse_data)
+    return await import_csv(file, WarehouseCreate, db, import_warehouses, settings.IMPORT_CHUNK_SIZE)
 
 
 @router.put(
@@ -105,12 +148,11 @@ async def create_warehouse_endpoint(
 async def update_warehouse_endpoint(
     warehouse_id: int,
     warehouse_data: WarehouseUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    updated_warehouse = update_warehouse(db, warehouse_id, warehouse_data)
+    updated_warehouse = await run_db(db, update_warehouse, warehouse_id, warehouse_data)
     if not updated_warehouse:
         raise HTTPException(status_code=404, detail="Almacén no encontrado")
     return updated_warehouse
@@ -126,12 +168,11 @@ async def update_warehouse_endpoint(
 )
 async def delete_warehouse_endpoint(
     warehouse_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    current_user: str = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(require_admin),
 ):
-    verify_admin(current_user)
-    warehouse = delete_warehouse(db, warehouse_id)
+    warehouse = await run_db(db, delete_warehouse, warehouse_id)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Almacén no encontrado")
     return warehouse
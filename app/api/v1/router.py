@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import user, auth, inventory, input, warehouse
+from app.api.v1.endpoints import user, auth, inventory, input, warehouse, reports, alerts, internal
 
 api_v1_router = APIRouter()
 
@@ -9,4 +9,7 @@ api_v1_router.include_router(user.router, tags=["Users"])
 api_v1_router.include_router(inventory.router, tags=["Inventories"])
 api_v1_router.include_router(input.router, tags=["Inputs"])
 api_v1_router.include_router(warehouse.router, tags=["Warehouses"])
+api_v1_router.include_router(reports.router, tags=["Reports"])
+api_v1_router.include_router(alerts.router, tags=["Alerts"])
+api_v1_router.include_router(internal.router, tags=["Internal"])
 
@@ -0,0 +1,69 @@
+"""
+Verifica o reconstruye la tabla `stock_level` y los checkpoints de existencias.
+
+Uso:
+    python -m app.commands.stock_level verify              # informa la deriva (código de salida 1 si la hay)
+    python -m app.commands.stock_level rebuild             # recalcula la tabla e informa la deriva corregida
+    python -m app.commands.stock_level checkpoint          # guarda el checkpoint del último periodo cerrado
+    python -m app.commands.stock_level verify-checkpoints [--fix]
+                                                           # compara los checkpoints con el recálculo completo;
+                                                           # con --fix elimina los que no coinciden
+"""
+import argparse
+import sys
+
+from app.core.db.config import settings
+from app.core.db.session import SessionLocal
+from app.crud.stock_level import (
+    build_checkpoint,
+    checkpoint_boundary,
+    rebuild_stock_levels,
+    verify_checkpoints,
+    verify_stock_levels,
+)
+# Registrar todos los modelos (relaciones entre ellos)
+from app.models import input, inventory, stock_level, user, warehouse  # noqa: F401
+
+
+def print_drift(drift: list):
+    for row in drift:
+        as_of = f" fecha={row['as_of']}" if "as_of" in row else ""
+        print(
+            f"almacén={row['warehouse_id']} insumo={row['input_id']}{as_of} "
+            f"esperado={row['expected']} actual={row['actual']}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica o reconstruye stock_level y sus checkpoints.")
+    parser.add_argument("action", choices=["verify", "rebuild", "checkpoint", "verify-checkpoints"])
+    parser.add_argument("--fix", action="store_true", help="Elimina los checkpoints que no coinciden")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        if args.action == "checkpoint":
+            as_of = checkpoint_boundary(db, settings.STOCK_CHECKPOINT_INTERVAL or 86400, settings.STOCK_CHECKPOINT_SETTLE)
+            print(f"Checkpoint {as_of}: {build_checkpoint(db, as_of)} existencias guardadas.")
+            return 0
+        if args.action == "verify-checkpoints":
+            drift = verify_checkpoints(db, fix=args.fix)
+        elif args.action == "verify":
+            drift = verify_stock_levels(db)
+        else:
+            drift = rebuild_stock_levels(db)
+
+    print_drift(drift)
+    if not drift:
+        print("Coincide con el historial de inventario.")
+    elif args.action == "rebuild":
+        print(f"{len(drift)} existencias corregidas.")
+    elif args.fix:
+        print(f"{len(drift)} checkpoints eliminados.")
+    else:
+        print(f"{len(drift)} existencias con diferencias.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """ETag fuerte a partir de los valores que identifican la versión de la respuesta."""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest() + '"'
+
+
+def _utc(value: datetime) -> datetime:
+    # Las fechas de la base de datos llegan sin zona horaria: se toman como UTC
+    value = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _is_fresh(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Si el cliente ya tiene esta versión. If-None-Match tiene prioridad sobre
+    If-Modified-Since (RFC 9110); para GET la comparación de ETags es débil.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return _utc(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional_get(request: Request, response: Response, etag: str, last_modified: Optional[datetime]):
+    """
+    Pone ETag y Last-Modified en `response` y retorna una respuesta 304 si el cliente ya
+    tiene esta versión (None si hay que enviar el cuerpo).
+
+    Se llama con el resultado de una consulta barata (updated_at de la fila, o conteo y
+    máximo de updated_at del listado) antes de leer las filas completas.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    if _is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def revalidate(request: Request, headers: dict):
+    """
+    304 para una respuesta ya generada (p. ej. guardada en la caché de respuestas) si el
+    cliente tiene la versión de sus headers ETag/Last-Modified; None si hay que enviarla.
+    """
+    etag = headers.get("etag")
+    if etag is None:
+        return None
+    last_modified = headers.get("last-modified")
+    if _is_fresh(request, etag, parsedate_to_datetime(last_modified) if last_modified else None):
+        kept = {"ETag": etag, **({"Last-Modified": last_modified} if last_modified else {})}
+        return Response(status_code=304, headers=kept)
+    return None
@@ -0,0 +1,72 @@
+import codecs
+import csv
+import itertools
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.db.session import run_db
+from app.schemas.csv_import import CsvImportResult
+
+
+def _validation_message(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    field = ".".join(str(part) for part in error["loc"])
+    message = error["msg"].replace("Value error, ", "")
+    return f"{field}: {message}" if field else message
+
+
+def _read_chunk(rows, schema, chunk_size: int):
+    """Lee hasta `chunk_size` filas del CSV y las valida con `schema`."""
+    valid, errors = [], []
+    try:
+        for row in itertools.islice(rows, chunk_size):
+            line = rows.line_num
+            if None in row:
+                errors.append({"row": line, "error": "La fila tiene más columnas que la cabecera"})
+                continue
+            try:
+                valid.append((line, schema.model_validate(row).model_dump()))
+            except ValidationError as e:
+                errors.append({"row": line, "error": _validation_message(e)})
+    except (UnicodeDecodeError, csv.Error) as e:
+        # No se puede seguir leyendo: se informa y se detiene la importación
+        errors.append({"row": rows.line_num + 1, "error": f"No se pudo leer el archivo desde esta fila: {e}"})
+        return valid, errors, True
+    return valid, errors, False
+
+
+async def import_csv(upload: UploadFile, schema, db, import_chunk, chunk_size: int) -> CsvImportResult:
+    """
+    Importa un CSV (UTF-8, con cabecera) por bloques de `chunk_size` filas.
+
+    El archivo se lee como flujo: nunca se carga entero en memoria. Cada bloque se valida
+    con `schema` y se guarda con `import_chunk(db, filas, vistos)` en su propia transacción;
+    `vistos` se comparte entre bloques para detectar valores repetidos dentro del archivo.
+    """
+    text = codecs.getreader("utf-8-sig")(upload.file)
+    rows = csv.DictReader(text)
+    try:
+        columns = await run_in_threadpool(lambda: rows.fieldnames)
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="El archivo debe ser un CSV codificado en UTF-8")
+    missing = set(schema.model_fields) - set(columns or [])
+    required = {name for name in missing if schema.model_fields[name].is_required()}
+    if required:
+        raise HTTPException(status_code=400, detail=f"Faltan columnas en el CSV: {', '.join(sorted(required))}")
+
+    created = updated = 0
+    report = []
+    seen = {}
+    while True:
+        valid, errors, stop = await run_in_threadpool(_read_chunk, rows, schema, chunk_size)
+        if valid:
+            chunk = await run_db(db, import_chunk, valid, seen)
+            created += chunk["created"]
+            updated += chunk["updated"]
+            errors += chunk["errors"]
+        report += errors
+        if stop or (not valid and not errors):
+            break
+    report.sort(key=lambda error: error["row"])
+    return CsvImportResult(created=created, updated=updated, failed=len(report), errors=report)
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv, dotenv_values
-from typing import ClassVar
+from typing import ClassVar, Optional
 from pydantic_settings import BaseSettings
 
 load_dotenv()
@@ -12,7 +12,79 @@ class Settings(BaseSettings):
     DB_HOST: str = env_values.get("DB_HOST")
     DB_PORT: int = int(env_values.get("DB_PORT", 3306))
     DB_NAME: str = env_values.get("DB_NAME")
+    # URL completa (opcional); si se define reemplaza a DB_USER/DB_HOST/... (ej. sqlite:///./agro.db)
+    DATABASE_URL: Optional[str] = env_values.get("DATABASE_URL")
+    # Motor asíncrono (aiomysql/aiosqlite + AsyncSession) en lugar del síncrono (pymysql)
+    DB_ASYNC: bool = env_values.get("DB_ASYNC", "false").lower() in ("true", "1")
+
+    # Pool de conexiones
+    DB_POOL_SIZE: int = int(env_values.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(env_values.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(env_values.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(env_values.get("DB_POOL_RECYCLE", 1800))  # segundos; < wait_timeout de MySQL
+    DB_POOL_PRE_PING: bool = env_values.get("DB_POOL_PRE_PING", "true").lower() in ("true", "1")
+    DB_POOL_WARMUP: int = int(env_values.get("DB_POOL_WARMUP", 2))  # conexiones abiertas al arrancar
+
+    # Réplicas de lectura: URLs separadas por comas (vacío = todo va al primario)
+    DB_REPLICA_URLS: str = env_values.get("DB_REPLICA_URLS", "")
+    DB_REPLICA_STRATEGY: str = env_values.get("DB_REPLICA_STRATEGY", "round_robin")  # o least_connections
+    DB_REPLICA_MAX_LAG: float = float(env_values.get("DB_REPLICA_MAX_LAG", 5))  # segundos
+    DB_REPLICA_CHECK_INTERVAL: float = float(env_values.get("DB_REPLICA_CHECK_INTERVAL", 10))
+    # Tras una escritura, las lecturas del mismo cliente van al primario durante N segundos
+    DB_REPLICA_STICKY_SECONDS: float = float(env_values.get("DB_REPLICA_STICKY_SECONDS", 5))
     SECRET_JTW: str = env_values.get("SECRET_JTW")
+    # Paginación por cursor de los listados
+    PAGE_SIZE_DEFAULT: int = int(env_values.get("PAGE_SIZE_DEFAULT", 100))
+    PAGE_SIZE_MAX: int = int(env_values.get("PAGE_SIZE_MAX", 1000))
+    # Filas por lote en las exportaciones (cursor del lado del servidor)
+    EXPORT_BATCH_SIZE: int = int(env_values.get("EXPORT_BATCH_SIZE", 1000))
+    # Máximo de movimientos por petición en POST /inventories/batch
+    INVENTORY_BATCH_MAX: int = int(env_values.get("INVENTORY_BATCH_MAX", 5000))
+    # Filas por bloque (y por transacción) en la importación CSV de insumos y almacenes
+    IMPORT_CHUNK_SIZE: int = int(env_values.get("IMPORT_CHUNK_SIZE", 1000))
+    # Checkpoints de existencias para consultas a una fecha (as_of); 0 desactiva el constructor
+    STOCK_CHECKPOINT_INTERVAL: int = int(env_values.get("STOCK_CHECKPOINT_INTERVAL", 86400))  # segundos
+    # Margen antes de cerrar un periodo, para no dejar fuera transacciones aún sin confirmar
+    STOCK_CHECKPOINT_SETTLE: int = int(env_values.get("STOCK_CHECKPOINT_SETTLE", 300))
+
+    # Serialización rápida de las respuestas (TypeAdapter precompilado + pydantic-core/orjson).
+    # false = camino estándar de FastAPI (json.dumps), por compatibilidad
+    FAST_JSON: bool = env_values.get("FAST_JSON", "false").lower() in ("true", "1")
+
+    # Cada cuántos segundos comprueba cada worker la versión de los catálogos en memoria (insumos, almacenes)
+    CATALOG_POLL_INTERVAL: float = float(env_values.get("CATALOG_POLL_INTERVAL", 1))
+
+    # Caché de los reportes de movimientos (por worker); un movimiento nuevo cambia su clave en todos los workers
+    REPORT_CACHE_SIZE: int = int(env_values.get("REPORT_CACHE_SIZE", 256))
+    REPORT_CACHE_TTL: float = float(env_values.get("REPORT_CACHE_TTL", 300))
+
+    # Caché de respuestas GET (listados de insumos y almacenes, existencias): memory (por worker),
+    # redis (compartida; RESPONSE_CACHE_URL=local usa un sustituto en el proceso) o none
+    RESPONSE_CACHE_BACKEND: str = env_values.get("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_URL: str = env_values.get("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+    RESPONSE_CACHE_SIZE: int = int(env_values.get("RESPONSE_CACHE_SIZE", 512))
+    RESPONSE_CACHE_TTL: float = float(env_values.get("RESPONSE_CACHE_TTL", 30))
+
+    # Pronóstico de consumo: días de historial usados y hora (reloj de la BD) del recálculo nocturno
+    FORECAST_WINDOW_DAYS: int = int(env_values.get("FORECAST_WINDOW_DAYS", 90))
+    FORECAST_REFRESH_HOUR: int = int(env_values.get("FORECAST_REFRESH_HOUR", 2))
+
+    # Cada cuántos segundos se envía el resumen de alertas de existencias bajas (0 lo desactiva)
+    ALERT_DIGEST_INTERVAL: float = float(env_values.get("ALERT_DIGEST_INTERVAL", 900))
+
+    # Caché del usuario autenticado (por worker); el TTL acota cuánto dura un cambio no propagado
+    AUTH_CACHE_SIZE: int = int(env_values.get("AUTH_CACHE_SIZE", 1024))
+    AUTH_CACHE_TTL: float = float(env_values.get("AUTH_CACHE_TTL", 60))
+    # Pool dedicado a bcrypt: hilos y máximo de trabajos en cola (el resto recibe 503)
+    PASSWORD_HASH_WORKERS: int = int(env_values.get("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_QUEUE: int = int(env_values.get("PASSWORD_HASH_MAX_QUEUE", 64))
+
+    # Outbox de correos: lote por envío, espera entre revisiones, reintentos y espera base (exponencial)
+    OUTBOX_BATCH_SIZE: int = int(env_values.get("OUTBOX_BATCH_SIZE", 50))
+    OUTBOX_POLL_INTERVAL: float = float(env_values.get("OUTBOX_POLL_INTERVAL", 2))
+    OUTBOX_MAX_ATTEMPTS: int = int(env_values.get("OUTBOX_MAX_ATTEMPTS", 8))
+    OUTBOX_BACKOFF_BASE: float = float(env_values.get("OUTBOX_BACKOFF_BASE", 30))
+    OUTBOX_LEASE: float = float(env_values.get("OUTBOX_LEASE", 300))  # segundos reservados al reclamar un lote
 
     MAIL_USERNAME: str = env_values.get("MAIL_USERNAME")
     MAIL_PASSWORD: str = env_values.get("MAIL_PASSWORD")
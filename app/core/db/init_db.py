@@ -1,5 +1,89 @@
-from app.core.db.session import Base, engine
+from sqlalchemy import inspect, text
+from app.core.db.session import Base, SessionLocal, engine
+from app.crud.catalog import create_version_rows
+from app.schemas.inventory import column_quantity, parse_quantity
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_inventory_quantity(connection):
+    """
+    Rellena inventory.quantity a partir de inventory.amount (texto), por lotes de id.
+
+    Las cantidades negativas o que no caben en la columna se dejan en 0 y se informan (en
+    MySQL estricto escribirlas abortaría el arranque).
+    """
+    last_id = 0
+    skipped = []
+    while True:
+        rows = connection.execute(
+            text("SELECT id, amount FROM inventory WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            quantity = parse_quantity(row.amount)
+            if quantity is None:
+                continue
+            try:
+                updates.append({"id": row.id, "quantity": str(column_quantity(quantity))})
+            except ValueError:
+                skipped.append(row.id)
+        if updates:
+            connection.execute(text("UPDATE inventory SET quantity = :quantity WHERE id = :id"), updates)
+        last_id = rows[-1].id
+    if skipped:
+        print(
+            f"⚠️ inventory.quantity: {len(skipped)} registros con cantidad negativa o fuera de rango "
+            f"quedan en 0; revisar su amount (ids: {', '.join(map(str, skipped[:20]))}"
+            f"{', ...' if len(skipped) > 20 else ''})"
+        )
+
+
+# Columnas añadidas a tablas ya existentes: (tabla, columna, definición, migración de datos)
+NEW_COLUMNS = [
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0", None),
+    ("inventory", "quantity", "NUMERIC(14, 3) NOT NULL DEFAULT 0", backfill_inventory_quantity),
+]
+
+
+def populate_stock_level(connection):
+    """Calcula stock_level desde el historial de inventario la primera vez que se crea la tabla."""
+    from app.crud.stock_level import rebuild_stock_levels
+
+    with SessionLocal(bind=connection) as db:
+        rebuild_stock_levels(db)
+
+
+# Tablas nuevas que se rellenan a partir de datos existentes: (tabla, migración de datos)
+NEW_TABLES = [
+    ("stock_level", populate_stock_level),
+]
+
+
+def upgrade_db(new_tables=()):
+    """Añade a las tablas existentes las columnas e índices nuevos de los modelos."""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, column, definition, backfill in NEW_COLUMNS:
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+                if backfill is not None:
+                    backfill(connection)
+        for table, populate in NEW_TABLES:
+            if table in new_tables:
+                populate(connection)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
 
 def init_db():
-    """Crea las tablas en la base de datos si no existen."""
+    """Crea las tablas en la base de datos si no existen y aplica las columnas e índices nuevos."""
+    existing = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    upgrade_db(new_tables={table.name for table in Base.metadata.sorted_tables} - existing)
+    with engine.begin() as connection:
+        create_version_rows(connection)
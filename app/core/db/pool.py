@@ -0,0 +1,122 @@
+import bisect
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.db.config import settings
+
+# Límites superiores (ms) de los buckets del histograma de espera por conexión
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolMetrics:
+    """Histograma del tiempo de espera para obtener una conexión del pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.total += 1
+            self.sum_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+
+    def timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={b}ms" for b in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "count": self.total,
+                "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "timeouts": self.timeouts,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Mide cuánto espera cada checkout antes de obtener una conexión."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # `dispose()`/`recreate()` crean un pool nuevo: se conservan las métricas
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeout()
+            raise
+        finally:
+            self.metrics.observe((time.perf_counter() - start) * 1000)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(asynchronous: bool = False) -> dict:
+    """Argumentos de `create_engine`/`create_async_engine` para el pool configurado."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine) -> dict:
+    """Estado actual del pool de un engine (síncrono o asíncrono)."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "wait": pool.metrics.snapshot() if hasattr(pool, "metrics") else None,
+    }
+
+
+def warm_up(engine, connections: int):
+    """Abre `connections` conexiones a la vez y las devuelve al pool."""
+    opened = []
+    try:
+        for _ in range(min(connections, settings.DB_POOL_SIZE)):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def warm_up_async(engine, connections: int):
+    """Versión de `warm_up` para `AsyncEngine`."""
+    opened = []
+    try:
+        for _ in range(min(connections, settings.DB_POOL_SIZE)):
+            opened.append(await engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
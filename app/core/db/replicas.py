@@ -0,0 +1,142 @@
+import asyncio
+import itertools
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+# Métodos que pueden leer de una réplica; el resto siempre va al primario
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    """Una réplica de lectura con sus engines/sesiones y su estado de salud."""
+
+    def __init__(self, name, engine, SessionLocal, async_engine=None, AsyncSessionLocal=None):
+        self.name = name
+        self.engine = engine
+        self.SessionLocal = SessionLocal
+        self.async_engine = async_engine
+        self.AsyncSessionLocal = AsyncSessionLocal
+        self.in_flight = 0
+        self.healthy = True
+        self.lag = None
+        self.error = None
+
+
+class ReplicaRouter:
+    """
+    Decide a qué base de datos va cada sesión de lectura.
+
+    - Métodos de escritura (POST/PUT/DELETE...) -> primario.
+    - Lecturas del mismo cliente poco después de una escritura -> primario
+      (lee sus propias escrituras aunque la réplica vaya retrasada).
+    - Resto de lecturas -> réplica sana elegida por round robin o por menor
+      número de sesiones abiertas (least_connections).
+    """
+
+    def __init__(self, replicas, strategy="round_robin", max_lag=5.0, sticky_seconds=5.0):
+        self.replicas = replicas
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._recent_writes = {}  # cliente -> instante (monotonic) de su última escritura
+
+    @staticmethod
+    def _client_key(request) -> str:
+        return request.headers.get("authorization") or (request.client.host if request.client else "")
+
+    def route(self, request):
+        """Devuelve la réplica para esta petición, o None si debe usar el primario."""
+        if not self.replicas:
+            return None
+
+        key = self._client_key(request)
+        now = time.monotonic()
+        # Se ejecuta desde el threadpool: las marcas de escritura y la elección de réplica
+        # se leen y modifican con el lock tomado
+        with self._lock:
+            if request.method not in SAFE_METHODS:
+                self._mark_write(key, now)
+                return None
+            last_write = self._recent_writes.get(key)
+            if last_write is not None and now - last_write < self.sticky_seconds:
+                return None
+
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if not healthy:
+                return None
+            if self.strategy == "least_connections":
+                replica = min(healthy, key=lambda r: r.in_flight)
+            else:
+                replica = healthy[next(self._counter) % len(healthy)]
+            replica.in_flight += 1
+        return replica
+
+    def release(self, replica):
+        with self._lock:
+            replica.in_flight -= 1
+
+    def _mark_write(self, key: str, now: float):
+        """Registra la escritura de `key` y descarta las marcas vencidas (con `self._lock` tomado)."""
+        if self.sticky_seconds <= 0:
+            return
+        self._recent_writes[key] = now
+        if len(self._recent_writes) > 1024:
+            self._recent_writes = {
+                k: t for k, t in self._recent_writes.items() if now - t < self.sticky_seconds
+            }
+
+    @staticmethod
+    def _measure_lag(replica):
+        """
+        Segundos de retraso de la réplica: 0 si no es MySQL o no replica de nadie,
+        None si la replicación está detenida.
+        """
+        with replica.engine.connect() as connection:
+            if connection.dialect.name != "mysql":
+                return 0.0
+            try:
+                row = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+                column = "Seconds_Behind_Source"
+            except SQLAlchemyError:
+                # MySQL < 8.0.22
+                connection.rollback()
+                row = connection.execute(text("SHOW SLAVE STATUS")).mappings().first()
+                column = "Seconds_Behind_Master"
+            if row is None:
+                return 0.0
+            lag = row.get(column)
+            return None if lag is None else float(lag)
+
+    def check(self):
+        """Mide el retraso de cada réplica y saca de rotación las que superan el umbral."""
+        for replica in self.replicas:
+            try:
+                replica.lag = self._measure_lag(replica)
+                replica.error = None if replica.lag is not None else "Replicación detenida"
+            except SQLAlchemyError as e:
+                replica.lag = None
+                replica.error = str(e)
+            replica.healthy = replica.lag is not None and replica.lag <= self.max_lag
+
+    async def monitor(self, interval: float):
+        """Tarea en segundo plano: revisa las réplicas cada `interval` segundos."""
+        while True:
+            await run_in_threadpool(self.check)
+            await asyncio.sleep(interval)
+
+    def status(self) -> list:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "in_flight": replica.in_flight,
+                "error": replica.error,
+            }
+            for replica in self.replicas
+        ]
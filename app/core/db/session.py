@@ -1,24 +1,115 @@
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import BigInteger, Integer, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.db.config import settings
+from app.core.db.pool import engine_options, warm_up, warm_up_async
+from app.core.db.replicas import Replica, ReplicaRouter
 from sqlalchemy.exc import OperationalError
 
-DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+# Driver síncrono y asíncrono por motor de base de datos
+SYNC_DRIVERS = {"mysql": "mysql+pymysql", "sqlite": "sqlite"}
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
 
-try:
-    engine = create_engine(DATABASE_URL)
-    connection = engine.connect()
-    connection.close()  
-    print(" Conexión a la base de datos exitosa.")  
-except OperationalError as e:  
-    print(f"❌ Error de conexión a la base de datos: {e}")  
-    exit(1)  
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def build_url(url: str, asynchronous: bool = False):
+    """Devuelve la URL con el driver síncrono o asíncrono correspondiente al motor."""
+    url = make_url(url)
+    drivers = ASYNC_DRIVERS if asynchronous else SYNC_DRIVERS
+    return url.set(drivername=drivers[url.get_backend_name()])
+
+
+def enforce_foreign_keys(engine):
+    """SQLite no comprueba las claves foráneas salvo que se active en cada conexión."""
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _foreign_keys_on(connection, _):
+            cursor = connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+    return engine
+
+
+DATABASE_URL = settings.DATABASE_URL or f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+
+engine = enforce_foreign_keys(create_engine(build_url(DATABASE_URL), **engine_options()))
+# expire_on_commit=False: tras el commit se siguen usando los valores ya conocidos, sin
+# volver a leer la fila (los generados por el servidor se obtienen con eager_defaults)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
+# Tipo de las claves primarias autoincrementales: BIGINT en MySQL; en SQLite solo una
+# columna INTEGER PRIMARY KEY es autoincremental
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
+
+# Motor asíncrono: solo se crea si DB_ASYNC está activo (requiere aiomysql/aiosqlite)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        build_url(DATABASE_URL, asynchronous=True), **engine_options(asynchronous=True)
+    )
+    enforce_foreign_keys(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+def make_replica(index: int, url: str) -> Replica:
+    engine = enforce_foreign_keys(create_engine(build_url(url), **engine_options()))
+    replica = Replica(
+        name=f"replica-{index}",
+        engine=engine,
+        SessionLocal=sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine),
+    )
+    if settings.DB_ASYNC:
+        replica.async_engine = create_async_engine(
+            build_url(url, asynchronous=True), **engine_options(asynchronous=True)
+        )
+        replica.AsyncSessionLocal = async_sessionmaker(
+            bind=replica.async_engine, autoflush=False, expire_on_commit=False
+        )
+    return replica
+
+
+replica_router = ReplicaRouter(
+    [
+        make_replica(index, url.strip())
+        for index, url in enumerate(settings.DB_REPLICA_URLS.split(","))
+        if url.strip()
+    ],
+    strategy=settings.DB_REPLICA_STRATEGY,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+)
+
+
+async def connect_db():
+    """Precalienta el pool (DB_POOL_WARMUP conexiones) al arrancar la aplicación."""
+    try:
+        await run_in_threadpool(warm_up, engine, settings.DB_POOL_WARMUP)
+        if async_engine is not None:
+            await warm_up_async(async_engine, settings.DB_POOL_WARMUP)
+        print(" Conexión a la base de datos exitosa.")
+    except OperationalError as e:
+        print(f"❌ Error de conexión a la base de datos: {e}")
+        raise
+
+
+async def disconnect_db():
+    """Cierra las conexiones del pool al detener la aplicación."""
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in replica_router.replicas:
+        replica.engine.dispose()
+        if replica.async_engine is not None:
+            await replica.async_engine.dispose()
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -27,3 +118,85 @@ def get_db():
         print(f"⚠️ Error al acceder a la base de datos: {e}")
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except OperationalError as e:
+            print(f"⚠️ Error al acceder a la base de datos: {e}")
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    replica = replica_router.route(request)
+    if replica is None:
+        yield db
+        return
+    replica_db = replica.SessionLocal()
+    try:
+        yield replica_db
+    finally:
+        replica_db.close()
+        replica_router.release(replica)
+
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    replica = replica_router.route(request)
+    if replica is None:
+        yield db
+        return
+    try:
+        async with replica.AsyncSessionLocal() as replica_db:
+            yield replica_db
+    finally:
+        replica_router.release(replica)
+
+
+# Dependencias usadas por los endpoints: sesión síncrona o asíncrona según DB_ASYNC.
+# `get_read_session` puede devolver una réplica en lecturas (ver ReplicaRouter).
+get_session = get_async_db if settings.DB_ASYNC else get_db
+get_read_session = get_async_read_db if settings.DB_ASYNC else get_read_db
+
+
+async def run_db(db, func, *args, **kwargs):
+    """
+    Ejecuta una función CRUD (escrita contra `Session`) sin bloquear el event loop.
+
+    - Con `AsyncSession` se ejecuta mediante `run_sync`: el driver es asíncrono y
+      cada consulta cede el control al event loop mientras espera a la base de datos.
+    - Con `Session` se ejecuta en el threadpool de AnyIO.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return await run_in_threadpool(func, db, *args, **kwargs)
+
+
+async def stream_rows(request: Request, statement, batch_size: int):
+    """
+    Ejecuta `statement` con un cursor del lado del servidor y entrega las filas por lotes.
+
+    Abre su propia sesión (réplica si corresponde): la sesión de la dependencia se cierra
+    antes de que se envíe el cuerpo de un `StreamingResponse`. La memoria usada no depende
+    del total de filas y el primer lote se entrega en cuanto llega.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    replica = replica_router.route(request)
+    try:
+        if settings.DB_ASYNC:
+            factory = replica.AsyncSessionLocal if replica else AsyncSessionLocal
+            async with factory() as db:
+                result = await db.stream(statement)
+                async for partition in result.partitions():
+                    yield partition
+        else:
+            db = (replica.SessionLocal if replica else SessionLocal)()
+            try:
+                partitions = (await run_in_threadpool(db.execute, statement)).partitions()
+                while partition := await run_in_threadpool(next, partitions, None):
+                    yield partition
+            finally:
+                await run_in_threadpool(db.close)
+    finally:
+        if replica is not None:
+            replica_router.release(replica)
@@ -1,22 +1,108 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from pydantic import EmailStr
+import asyncio
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
+from starlette.concurrency import run_in_threadpool
+
 from app.core.db.config import settings
+from app.core.db.session import SessionLocal
+from app.crud.outbox import claim_emails, complete_emails
+
+
+def build_message(email) -> EmailMessage:
+    """Mensaje HTML a partir de una fila del outbox."""
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = email.recipients
+    message["Subject"] = email.subject
+    message.set_content(email.body, subtype="html")
+    return message
+
+
+class OutboxSender:
+    """
+    Envía los correos del outbox en segundo plano.
+
+    - Mantiene abierta una conexión SMTP entre lotes (se reconecta si el servidor la cierra).
+    - Toma lotes de OUTBOX_BATCH_SIZE; si el lote viene lleno sigue sin esperar.
+    - Los enviados se eliminan; los fallidos se reintentan con espera exponencial y pasan a
+      'dead' al agotar los intentos (o de inmediato si el servidor rechaza el destinatario).
+    """
+
+    def __init__(self):
+        self.smtp = None
+
+    async def connect(self):
+        if self.smtp is not None and self.smtp.is_connected:
+            return
+        self.smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=int(settings.MAIL_PORT) if settings.MAIL_PORT else None,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS and not settings.MAIL_SSL_TLS,
+            timeout=30,
+        )
+        await self.smtp.connect()
+        if settings.USE_CREDENTIALS:
+            await self.smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+
+    async def close(self):
+        if self.smtp is not None and self.smtp.is_connected:
+            try:
+                await self.smtp.quit()
+            except aiosmtplib.SMTPException:
+                self.smtp.close()
+        self.smtp = None
+
+    async def send(self, email):
+        """Envía un correo; reintenta una vez si la conexión persistente se había cerrado."""
+        try:
+            await self.connect()
+            await self.smtp.send_message(build_message(email))
+        except aiosmtplib.SMTPServerDisconnected:
+            await self.close()
+            await self.connect()
+            await self.smtp.send_message(build_message(email))
+
+    async def send_batch(self) -> bool:
+        """Envía un lote del outbox; retorna True si conviene seguir sin esperar (lote lleno)."""
+        with SessionLocal() as db:
+            emails = await run_in_threadpool(claim_emails, db, settings.OUTBOX_BATCH_SIZE)
+            if not emails:
+                return False
+            sent, failures = [], {}
+            disconnected = False
+            for email in emails:
+                try:
+                    await self.send(email)
+                    sent.append(email.id)
+                except (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPSenderRefused) as e:
+                    failures[email.id] = (str(e), True)
+                except (aiosmtplib.SMTPException, OSError) as e:
+                    failures[email.id] = (str(e), False)
+                    # Sin conexión: el resto del lote se reintenta más tarde sin contar intento
+                    await self.close()
+                    disconnected = True
+                    break
+            await run_in_threadpool(complete_emails, db, sent, failures)
+            return not disconnected and len(emails) == settings.OUTBOX_BATCH_SIZE
+
+    async def run(self):
+        """Tarea en segundo plano: vacía el outbox y espera OUTBOX_POLL_INTERVAL cuando no hay más."""
+        try:
+            while True:
+                try:
+                    if await self.send_batch():
+                        continue
+                except Exception as e:
+                    # Cualquier error (base de datos, SMTP inesperado...) se registra y se reintenta:
+                    # la tarea debe seguir viva mientras dure el proceso
+                    print(f"⚠️ Error en el envío de correos: {e!r}")
+                    await self.close()
+                await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL)
+        finally:
+            await self.close()
+
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS
-)
-
-
-async def send_email(subject: str, recipients: list[EmailStr], body: str):
-    message = MessageSchema(
-        subject=subject, recipients=recipients, body=body, subtype="html"
-    )
-    fm = FastMail(conf)
-    await fm.send_message(message)
+outbox_sender = OutboxSender()
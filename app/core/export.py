@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+async def ndjson_chunks(columns: list, batches):
+    """Convierte lotes de filas en NDJSON: un objeto por línea, un chunk por lote."""
+    async for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+async def csv_chunks(columns: list, batches):
+    """Convierte lotes de filas en CSV (con cabecera), un chunk por lote."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue()
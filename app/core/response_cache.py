@@ -0,0 +1,240 @@
+import hashlib
+import json
+import threading
+import time
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.conditional import revalidate
+from app.core.db.config import settings
+
+try:
+    import redis
+except ImportError:  # opcional: solo lo necesita RESPONSE_CACHE_BACKEND=redis con una URL real
+    redis = None
+
+# Headers de la respuesta que se guardan junto al cuerpo
+CACHED_HEADERS = ("content-type", "x-next-cursor", "etag", "last-modified")
+
+
+class MemoryStore:
+    """Almacén en el proceso (LRU con TTL): cada worker tiene sus entradas y sus versiones de etiquetas."""
+
+    remote = False
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache("responses", maxsize=maxsize, ttl=ttl)
+        self.versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        return self.entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.entries.set(key, value, ttl)
+
+    def tag_versions(self, tags) -> list:
+        with self._lock:
+            return [self.versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self.versions[tag] = self.versions.get(tag, 0) + 1
+
+
+class LocalRedis:
+    """
+    Sustituto local del subconjunto de Redis que usa `RedisStore` (get, set con `ex`, mget,
+    incr). Permite ejecutar el camino fuera de proceso (serialización, claves, etiquetas) sin
+    un servidor; no se comparte entre procesos.
+    """
+
+    def __init__(self):
+        self._data = {}  # clave -> (expira_en, valor)
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        entry = self._data.get(name)
+        if entry is None or (entry[0] is not None and entry[0] < time.monotonic()):
+            self._data.pop(name, None)
+            return None
+        return entry[1]
+
+    def get(self, name):
+        with self._lock:
+            return self._get(name)
+
+    def mget(self, names):
+        with self._lock:
+            return [self._get(name) for name in names]
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (time.monotonic() + ex if ex else None, value)
+
+    def incr(self, name):
+        with self._lock:
+            value = int(self._get(name) or 0) + 1
+            self._data[name] = (None, str(value).encode())
+            return value
+
+
+class RedisStore:
+    """
+    Almacén fuera de proceso: entradas y versiones de etiquetas en Redis, compartidas por
+    todos los workers (una escritura en uno invalida la caché de los demás).
+    """
+
+    remote = True
+
+    def __init__(self, client, prefix: str = "agro:responses:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def tag_versions(self, tags) -> list:
+        return [int(value or 0) for value in self.client.mget([f"{self.prefix}tag:{tag}" for tag in tags])]
+
+    def bump(self, tags):
+        for tag in tags:
+            self.client.incr(f"{self.prefix}tag:{tag}")
+
+
+def build_store():
+    """Almacén según RESPONSE_CACHE_BACKEND: memory (por defecto), redis o none (desactivada)."""
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "redis":
+        url = settings.RESPONSE_CACHE_URL
+        if url == "local":
+            return RedisStore(LocalRedis())
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requiere el paquete 'redis' (o RESPONSE_CACHE_URL=local)")
+        return RedisStore(redis.Redis.from_url(url))
+    if backend == "memory":
+        return MemoryStore(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL)
+    raise RuntimeError(f"RESPONSE_CACHE_BACKEND desconocido: {settings.RESPONSE_CACHE_BACKEND}")
+
+
+def encode_entry(response: Response) -> bytes:
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in response.raw_headers
+        if name.decode("latin-1") in CACHED_HEADERS
+    }
+    return json.dumps(headers).encode() + b"\n" + response.body
+
+
+def decode_entry(value: bytes):
+    headers, _, body = value.partition(b"\n")
+    return json.loads(headers), body
+
+
+class ResponseCache:
+    """
+    Caché compartida de respuestas GET ya serializadas (cuerpo y headers).
+
+    - Clave: ruta + parámetros de consulta normalizados (ordenados) + rol del usuario +
+      versión actual de cada etiqueta de la ruta (insumos, almacenes, inventario...) +
+      versiones externas que pase la ruta (la de los catálogos en memoria, ya compartida
+      entre workers por catalog_version).
+    - Las escrituras en `app/crud` llaman a `invalidate(*etiquetas)` tras el commit, que
+      incrementa la versión de esas etiquetas: las entradas anteriores dejan de consultarse
+      y expiran por TTL/LRU. Como las versiones se leen antes de consultar la base de datos,
+      una respuesta calculada durante una escritura queda guardada con la versión anterior.
+    - Con el almacén en memoria la invalidación de etiquetas solo alcanza al worker que
+      escribe: en los demás el TTL limita cuánto tiempo se sirve una respuesta obsoleta,
+      salvo en las rutas que pasan la versión de su catálogo (cambia la clave en todos los
+      workers en CATALOG_POLL_INTERVAL). Con Redis se comparten entradas y versiones.
+    - Estadísticas por ruta (por worker): aciertos, fallos y bytes guardados/servidos.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.ttl = settings.RESPONSE_CACHE_TTL
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    async def _call(self, func, *args):
+        if self.store.remote:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    def _route_stats(self, route: str) -> dict:
+        return self.routes.setdefault(
+            route, {"hits": 0, "misses": 0, "stores": 0, "bytes_stored": 0, "bytes_served": 0}
+        )
+
+    async def get(self, request: Request, user, route: str, tags: tuple, versions: tuple = ()):
+        """
+        Busca la respuesta de `request`. Retorna (clave, respuesta): la respuesta (200, o 304 si
+        el cliente ya tiene esa versión) en un acierto; None en un fallo, y entonces la clave
+        se pasa a `put` con la respuesta generada. Sin caché retorna (None, None).
+
+        `versions`: versiones adicionales de los datos de la ruta que forman parte de la clave.
+        """
+        if not self.enabled:
+            return None, None
+        tag_versions = await self._call(self.store.tag_versions, tags)
+        query = urlencode(sorted(request.query_params.multi_items()))
+        role = "admin" if user.is_admin else "user"
+        key = hashlib.sha1(repr((route, query, role, tuple(zip(tags, tag_versions)), versions)).encode()).hexdigest()
+
+        value = await self._call(self.store.get, key)
+        with self._lock:
+            stats = self._route_stats(route)
+            if value is None:
+                stats["misses"] += 1
+                return key, None
+            stats["hits"] += 1
+        headers, body = decode_entry(value)
+        if not_modified := revalidate(request, headers):
+            return key, not_modified
+        with self._lock:
+            stats["bytes_served"] += len(body)
+        return key, Response(content=body, headers=headers)
+
+    async def put(self, route: str, key: str, response: Response) -> Response:
+        """Guarda `response` (ya serializada, status 200) bajo `key` y la retorna."""
+        if key is None or response.status_code != 200:
+            return response
+        await self._call(self.store.set, key, encode_entry(response), self.ttl)
+        with self._lock:
+            stats = self._route_stats(route)
+            stats["stores"] += 1
+            stats["bytes_stored"] += len(response.body)
+        return response
+
+    def invalidate(self, *tags):
+        """Invalida las respuestas etiquetadas con `tags` (llamar después del commit)."""
+        if self.enabled:
+            self.store.bump(tags)
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {}
+            for route, stats in self.routes.items():
+                lookups = stats["hits"] + stats["misses"]
+                routes[route] = {
+                    **stats,
+                    "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                    "avg_entry_bytes": stats["bytes_stored"] // stats["stores"] if stats["stores"] else 0,
+                }
+        return {"backend": settings.RESPONSE_CACHE_BACKEND, "ttl": self.ttl, "routes": routes}
+
+
+response_cache = ResponseCache(build_store())
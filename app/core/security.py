@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import HTTPException, Depends, status
@@ -7,8 +10,10 @@ from passlib.context import CryptContext
 from pydantic import BaseModel
 from typing import Optional
 from app.core.db.config import settings
-from app.crud.user import get_user_by_username
-from app.core.db.session import get_db
+from app.core.cache import TTLCache
+from app.crud.user import get_user_by_username, get_token_version
+from app.schemas.user import UserPrincipal
+from app.core.db.session import get_read_session, run_db
 from sqlalchemy.orm import Session
 import jwt
 
@@ -23,6 +28,11 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Esquema de seguridad unificado (HTTP Bearer)
 bearer_scheme = HTTPBearer(bearerFormat="JWT", auto_error=True)
 
+# Caché de usuarios autenticados por 'sub' del token (invalidada en crud.user)
+principal_cache = TTLCache("principals", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+# Versión vigente de los tokens de cada usuario por id (actualizada en crud.user)
+token_version_cache = TTLCache("token_versions", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
 # Modelo para datos del token (opcional)
 class TokenData(BaseModel):
     """
@@ -50,6 +60,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Claims del token de acceso de un usuario
+def token_claims(user) -> dict:
+    """
+    Construye el payload del token de acceso para un usuario.
+
+    Incluye lo necesario para autorizar sin consultar la tabla de usuarios:
+    - sub: nombre de usuario
+    - uid: id del usuario
+    - adm: si es administrador
+    - ver: versión de token del usuario; al incrementarla se revocan los tokens emitidos antes
+    """
+    return {"sub": user.name, "uid": user.id, "adm": user.is_admin, "ver": user.token_version}
+
 # Función para verificar y decodificar tokens JWT
 def decode_token(token: str) -> dict:
     """
@@ -75,15 +98,19 @@ def decode_token(token: str) -> dict:
         )
 
 # Dependencia principal para obtener el usuario actual
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> str:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_read_session)) -> UserPrincipal:
     """
     Obtiene el usuario actual a partir del token JWT proporcionado.
 
+    Si el token trae claims (uid/adm/ver) el usuario se construye desde ellos y solo se
+    comprueba la versión de token (cacheada en `token_version_cache`). Los tokens antiguos,
+    que solo traen 'sub', se resuelven contra la base de datos y se guardan en `principal_cache`.
+
     Parámetros:
     - credentials (HTTPAuthorizationCredentials): El esquema de seguridad para obtener el token JWT del encabezado de autorización.
 
     Retorna:
-    - str: El nombre de usuario del usuario autenticado extraído del payload del token.
+    - UserPrincipal: El usuario autenticado (id, nombre y si es administrador).
 
     Lanza:
     - HTTPException: Si el token es inválido o ha expirado, o si no se encuentra el nombre de usuario en el payload.
@@ -98,7 +125,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
             detail="Credenciales de autenticación inválidas",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = get_user_by_username(db, username) 
+    if "uid" in payload:
+        await verify_token_version(db, payload["uid"], payload.get("ver"))
+        return UserPrincipal(id=payload["uid"], name=username, is_admin=payload.get("adm", False))
+
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
+
+    user = await run_db(db, get_user_by_username, username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -106,7 +141,51 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
+    principal = UserPrincipal.model_validate(user)
+    principal_cache.set(username, principal)
+    return principal
+
+
+async def verify_token_version(db: Session, user_id: int, version: Optional[int]):
+    """
+    Comprueba que la versión del token coincide con la vigente del usuario.
+
+    Lanza:
+    - HTTPException 401: Si el usuario ya no existe o el token fue revocado.
+    """
+    current_version = token_version_cache.get(user_id)
+    if current_version is None:
+        current_version = await run_db(db, get_token_version, user_id)
+        if current_version is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario no encontrado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_version_cache.set(user_id, current_version)
+
+    if version != current_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# Dependencia de autorización para endpoints de administrador
+async def require_admin(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
+    """
+    Exige que el usuario autenticado sea administrador (según los claims del token).
+
+    Lanza:
+    - HTTPException 403: Si el usuario no es administrador.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para esta acción",
+        )
+    return current_user
 
 
 # Funciones de utilidad para contraseñas
@@ -134,3 +213,75 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     - bool: True si las contraseñas coinciden, False en caso contrario.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordWorkerPool:
+    """
+    Pool acotado de hilos reservado para bcrypt.
+
+    bcrypt libera el GIL, así que los hilos bastan para no bloquear el event loop
+    sin ocupar el threadpool de AnyIO que usa el resto de la API. Si la cola supera
+    `max_queue` se responde 503 en lugar de acumular trabajo (p. ej. en una avalancha de logins).
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _run(self, func, args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado, intenta de nuevo en unos segundos",
+                )
+            self.queued += 1
+        return await asyncio.wrap_future(self.executor.submit(self._run, func, args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_pool = PasswordWorkerPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+async def hash_password_async(password: str) -> str:
+    """Versión de `hash_password` que se ejecuta en `password_pool`."""
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña en `password_pool`.
+
+    Retorna:
+    - (bool, Optional[str]): Si coincide y, cuando passlib indica que el hash está
+      obsoleto (esquema o rondas antiguas), el nuevo hash a guardar.
+    """
+    return await password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
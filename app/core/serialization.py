@@ -0,0 +1,74 @@
+import functools
+from typing import List
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.db.config import settings
+from app.schemas.fields import sparse_model
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa pydantic-core
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    `JSONResponse` que escribe los bytes con orjson (si está instalado) o pydantic-core en
+    lugar de `json.dumps`. Misma salida compacta y en UTF-8 sin escapar.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return pydantic_core.to_json(content)
+
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(schema) -> TypeAdapter:
+    """`TypeAdapter` de `List[schema]`, construido (compilado) una sola vez por esquema."""
+    return TypeAdapter(List[schema])
+
+
+def list_response(
+    schema, items, response: Response = None, exclude_unset: bool = False, fields: tuple = None, render: bool = False
+):
+    """
+    Respuesta de un listado.
+
+    Con FAST_JSON valida `items` con el `TypeAdapter` precompilado del esquema y lo serializa
+    directamente a bytes (pydantic-core), sin la validación de `response_model`, el paso a
+    objetos JSON intermedios ni `json.dumps`. Conserva los headers puestos en `response`
+    (p. ej. X-Next-Cursor). Sin FAST_JSON retorna `items` para el camino estándar de FastAPI.
+
+    Con `fields` se serializa siempre así, con el modelo reducido a esos campos. Con `render`
+    (sin FAST_JSON) se retorna la respuesta ya renderizada con `json.dumps`, los mismos bytes
+    que el camino estándar, para guardarlos en la caché de respuestas.
+    """
+    if fields:
+        schema = sparse_model(schema, fields)
+    elif not (settings.FAST_JSON or render):
+        return items
+    adapter = list_adapter(schema)
+    items = adapter.validate_python(items, from_attributes=True)
+    if fields or settings.FAST_JSON:
+        result = Response(content=adapter.dump_json(items, exclude_unset=exclude_unset), media_type="application/json")
+    else:
+        result = JSONResponse(content=adapter.dump_python(items, mode="json", exclude_unset=exclude_unset))
+    if response is not None:
+        result.raw_headers.extend(response.raw_headers)
+    return result
+
+
+def item_response(schema, item, fields: tuple = None, response: Response = None):
+    """Respuesta de un solo registro: con `fields`, solo esos campos; si no, `item` para `response_model`."""
+    if not fields:
+        return item
+    model = sparse_model(schema, fields)
+    result = Response(content=model.model_validate(item).model_dump_json(), media_type="application/json")
+    if response is not None:
+        result.raw_headers.extend(response.raw_headers)
+    return result
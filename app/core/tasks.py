@@ -0,0 +1,65 @@
+import asyncio
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.core.db.config import settings
+from app.core.db.session import SessionLocal
+from app.core.email import outbox_sender
+from app.crud.alert import queue_alert_digest
+from app.crud.forecast import forecasts_stale, refresh_forecasts
+from app.crud.stock_level import build_checkpoint, checkpoint_boundary
+
+
+async def run_periodically(func, interval: float):
+    """
+    Tarea en segundo plano: ejecuta `func` cada `interval` segundos (las funciones
+    síncronas se ejecutan en el threadpool).
+    """
+    while True:
+        try:
+            if asyncio.iscoroutinefunction(func):
+                await func()
+            else:
+                await run_in_threadpool(func)
+        except Exception as e:
+            # Cualquier error (base de datos, cálculo, datos inesperados...) se registra y la
+            # tarea sigue: si terminara, no se volvería a ejecutar hasta reiniciar el proceso
+            print(f"⚠️ Error en la tarea {func.__name__}: {e!r}")
+        await asyncio.sleep(interval)
+
+
+def build_stock_checkpoints():
+    """Guarda el checkpoint de existencias del último periodo cerrado, si aún no existe."""
+    with SessionLocal() as db:
+        as_of = checkpoint_boundary(db, settings.STOCK_CHECKPOINT_INTERVAL, settings.STOCK_CHECKPOINT_SETTLE)
+        try:
+            build_checkpoint(db, as_of)
+        except IntegrityError:
+            # Otro worker lo guardó a la vez
+            db.rollback()
+
+
+def refresh_stock_forecasts():
+    """Recalcula los pronósticos una vez por noche (a partir de FORECAST_REFRESH_HOUR)."""
+    with SessionLocal() as db:
+        if forecasts_stale(db):
+            refresh_forecasts(db)
+
+
+def send_alert_digest():
+    """Encola en un solo correo las alertas de existencias bajas pendientes."""
+    with SessionLocal() as db:
+        queue_alert_digest(db)
+
+
+def background_tasks() -> list:
+    """Corrutinas de las tareas periódicas activas según la configuración."""
+    tasks = []
+    if settings.STOCK_CHECKPOINT_INTERVAL > 0:
+        # Revisa varias veces por periodo para no depender de cuándo arrancó el proceso
+        check_every = min(settings.STOCK_CHECKPOINT_INTERVAL, 3600)
+        tasks.append(run_periodically(build_stock_checkpoints, check_every))
+    tasks.append(run_periodically(refresh_stock_forecasts, 600))
+    if settings.ALERT_DIGEST_INTERVAL > 0:
+        tasks.append(run_periodically(send_alert_digest, settings.ALERT_DIGEST_INTERVAL))
+    tasks.append(outbox_sender.run())
+    return tasks
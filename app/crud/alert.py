@@ -0,0 +1,144 @@
+import html
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.db.config import settings
+from app.crud.integrity import constraint_errors
+from app.crud.outbox import enqueue_email
+from app.models.stock_alert import StockAlert, StockThreshold
+from app.models.input import Input
+from app.models.stock_level import StockLevel
+from app.models.warehouse import Warehouse
+from app.schemas.alert import AlertFilter, StockThresholdSet
+
+FOREIGN_KEY_MESSAGES = {
+    "input_id": "El insumo especificado no existe",
+    "warehouse_id": "El almacén especificado no existe",
+}
+
+
+def evaluate_alerts(db: Session, pairs) -> None:
+    """
+    Revisa el umbral de los pares (almacén, insumo) afectados por una escritura.
+
+    Una sola consulta para todos los pares. Crea la alerta al bajar del mínimo, actualiza la
+    cantidad si ya existía (sin duplicarla) y la elimina al recuperarse. No hace commit: se
+    ejecuta en la transacción del movimiento.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    rows = (
+        db.query(StockThreshold, func.coalesce(StockLevel.quantity, 0), StockAlert)
+        .outerjoin(
+            StockLevel,
+            and_(StockLevel.warehouse_id == StockThreshold.warehouse_id, StockLevel.input_id == StockThreshold.input_id),
+        )
+        .outerjoin(
+            StockAlert,
+            and_(StockAlert.warehouse_id == StockThreshold.warehouse_id, StockAlert.input_id == StockThreshold.input_id),
+        )
+        .filter(tuple_(StockThreshold.warehouse_id, StockThreshold.input_id).in_(pairs))
+        .all()
+    )
+    for threshold, quantity, alert in rows:
+        if quantity < threshold.minimum:
+            if alert is None:
+                db.add(StockAlert(
+                    warehouse_id=threshold.warehouse_id,
+                    input_id=threshold.input_id,
+                    quantity=quantity,
+                    minimum=threshold.minimum,
+                ))
+            else:
+                alert.quantity = quantity
+                alert.minimum = threshold.minimum
+        elif alert is not None:
+            db.delete(alert)
+    db.flush()
+
+
+def get_thresholds(db: Session, filters: AlertFilter):
+    query = db.query(StockThreshold)
+    if filters.warehouse_id is not None:
+        query = query.filter(StockThreshold.warehouse_id == filters.warehouse_id)
+    if filters.input_id is not None:
+        query = query.filter(StockThreshold.input_id == filters.input_id)
+    return query.order_by(StockThreshold.warehouse_id, StockThreshold.input_id).all()
+
+
+def set_threshold(db: Session, threshold: StockThresholdSet):
+    db_threshold = db.get(StockThreshold, (threshold.warehouse_id, threshold.input_id))
+    with constraint_errors(db, FOREIGN_KEY_MESSAGES, "El almacén o insumo especificado no existe"):
+        if db_threshold is None:
+            db_threshold = StockThreshold(**threshold.model_dump())
+            db.add(db_threshold)
+        else:
+            db_threshold.minimum = threshold.minimum
+        db.flush()
+        evaluate_alerts(db, [(threshold.warehouse_id, threshold.input_id)])
+        db.commit()
+    return db_threshold
+
+
+def delete_threshold(db: Session, warehouse_id: int, input_id: int):
+    db_threshold = db.get(StockThreshold, (warehouse_id, input_id))
+    if not db_threshold:
+        raise HTTPException(status_code=404, detail="Umbral no encontrado")
+    db.query(StockAlert).filter(StockAlert.warehouse_id == warehouse_id, StockAlert.input_id == input_id).delete()
+    db.delete(db_threshold)
+    db.commit()
+    return db_threshold
+
+
+def get_alerts(db: Session, filters: AlertFilter):
+    query = db.query(StockAlert)
+    if filters.warehouse_id is not None:
+        query = query.filter(StockAlert.warehouse_id == filters.warehouse_id)
+    if filters.input_id is not None:
+        query = query.filter(StockAlert.input_id == filters.input_id)
+    return query.order_by(StockAlert.warehouse_id, StockAlert.input_id).all()
+
+
+def queue_alert_digest(db: Session) -> int:
+    """
+    Marca como notificadas las alertas pendientes y encola su resumen en el outbox, en la
+    misma transacción: el correo se envía solo si las alertas quedaron marcadas y viceversa.
+
+    SKIP LOCKED evita que dos workers resuman las mismas alertas. Retorna cuántas se incluyeron.
+    """
+    alerts = (
+        db.query(StockAlert)
+        .filter(StockAlert.notified_at.is_(None))
+        .order_by(StockAlert.warehouse_id, StockAlert.input_id)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if alerts:
+        now = db.query(func.now()).scalar()
+        for alert in alerts:
+            alert.notified_at = now
+        enqueue_email(db, "Alertas de existencias bajas", [settings.ADMIN_EMAIL], alert_digest_body(db, alerts))
+        db.commit()
+    return len(alerts)
+
+
+def alert_digest_body(db: Session, alerts: list) -> str:
+    """HTML del correo de resumen, con los nombres de almacenes e insumos."""
+    warehouses = dict(db.query(Warehouse.id, Warehouse.name).filter(Warehouse.id.in_({a.warehouse_id for a in alerts})))
+    inputs = dict(db.query(Input.id, Input.name).filter(Input.id.in_({a.input_id for a in alerts})))
+    rows = "".join(
+        f"<tr><td>{html.escape(str(warehouses.get(a.warehouse_id, a.warehouse_id)))}</td>"
+        f"<td>{html.escape(str(inputs.get(a.input_id, a.input_id)))}</td>"
+        f"<td>{a.quantity}</td><td>{a.minimum}</td></tr>"
+        for a in alerts
+    )
+    return f"""
+    <h2>Existencias por debajo del mínimo</h2>
+    <table>
+    <tr><th>Almacén</th><th>Insumo</th><th>Existencias</th><th>Mínimo</th></tr>
+    {rows}
+    </table>
+    """
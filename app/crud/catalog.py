@@ -0,0 +1,152 @@
+import threading
+import time
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import caches
+from app.core.db.config import settings
+from app.models.catalog_version import CatalogVersion
+from app.models.input import Input
+from app.models.warehouse import Warehouse
+
+
+# Catálogos en memoria, por nombre (cada uno con su fila en catalog_version)
+catalogs = {}
+# Filas de catalog_version que no son de un catálogo en memoria (ver crud.report)
+version_names = ["movements"]
+
+
+def version_rows_insert(names):
+    """INSERT de las filas de catalog_version que falten; ignora las que ya existen (aunque las inserte otra transacción)."""
+    statement = insert(CatalogVersion).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+    return statement.values([{"name": name, "version": 0} for name in names])
+
+
+def create_version_rows(connection):
+    """Crea al iniciar la fila de versión de cada catálogo, para que `bump` solo tenga que incrementarla."""
+    connection.execute(version_rows_insert([*catalogs, *version_names]))
+
+
+def get_version(db: Session, name: str) -> int:
+    """Versión actual de la fila `name` de catalog_version (una lectura por clave primaria)."""
+    return db.query(CatalogVersion.version).filter(CatalogVersion.name == name).scalar() or 0
+
+
+def bump_version(db: Session, name: str):
+    """
+    Incrementa la fila `name` de catalog_version. No hace commit: va en la transacción de la escritura.
+
+    La fila se crea en init_db; si falta, se inserta ignorando el conflicto con otro
+    worker que la cree a la vez (un INSERT normal fallaría con un error de clave primaria).
+    """
+    for _ in range(2):
+        updated = (
+            db.query(CatalogVersion)
+            .filter(CatalogVersion.name == name)
+            .update({CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False)
+        )
+        if updated:
+            return
+        db.execute(version_rows_insert([name]))
+
+
+class CatalogCache:
+    """
+    Copia en memoria de un catálogo pequeño (insumos, almacenes), versionada.
+
+    - Las escrituras del catálogo llaman a `bump` antes del commit (incrementa su fila en
+      catalog_version) y a `invalidate` después: el worker que escribe recarga enseguida.
+    - Los demás workers consultan la versión (una lectura por clave primaria) como mucho
+      cada CATALOG_POLL_INTERVAL segundos y recargan la tabla completa si cambió.
+    - Las filas son tuplas de columnas (`Row`), inmutables y compartibles entre hilos; la
+      copia (versión, filas, índice) se reemplaza en una sola asignación.
+    """
+
+    def __init__(self, name: str, model):
+        self.name = name
+        self.model = model
+        self.state = (None, [], {})  # (versión, filas, filas por id): se reemplaza entera
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reloads = 0
+        caches[f"{name}_catalog"] = self
+        catalogs[name] = self
+
+    @property
+    def version(self):
+        return self.state[0]
+
+    def _current(self, db: Session) -> tuple:
+        """
+        Retorna (versión, filas, filas por id), recargando si la versión cambió (comprobando
+        como mucho cada CATALOG_POLL_INTERVAL).
+
+        La consulta se hace sin el lock: con DB_ASYNC las peticiones comparten el hilo del
+        event loop y un lock tomado durante la espera del driver lo bloquearía. El lock solo
+        protege el reemplazo de la copia, que nunca vuelve a una versión anterior.
+        """
+        state = self.state
+        if state[0] is not None and time.monotonic() - self.checked_at < settings.CATALOG_POLL_INTERVAL:
+            self.hits += 1
+            return state
+        version = get_version(db, self.name)
+        if version == state[0]:
+            self.hits += 1
+            self.checked_at = time.monotonic()
+            return state
+        rows = db.query(*self.model.__table__.columns).order_by(self.model.id).all()
+        loaded = (version, rows, {row.id: row for row in rows})
+        with self._lock:
+            if self.state[0] is None or self.state[0] <= version:
+                self.state = loaded
+                self.reloads += 1
+            self.checked_at = time.monotonic()
+            return self.state
+
+    def current_version(self, db: Session):
+        """Versión de la copia en memoria (comprobada como mucho cada CATALOG_POLL_INTERVAL)."""
+        return self._current(db)[0]
+
+    def all(self, db: Session) -> list:
+        return self._current(db)[1]
+
+    def get(self, db: Session, id_: int):
+        return self._current(db)[2].get(id_)
+
+    def last_modified(self, db: Session, matches=None) -> tuple:
+        """(conteo, último updated_at) de las filas que cumplen `matches`, para ETag/Last-Modified."""
+        rows = [row for row in self.all(db) if matches is None or matches(row)]
+        return len(rows), max((row.updated_at for row in rows), default=None)
+
+    def existing_ids(self, db: Session, ids: set) -> set:
+        """
+        Ids de `ids` que existen. Los que no están en memoria se confirman en la base de
+        datos (pudieron crearse en otro worker antes de la siguiente comprobación).
+        """
+        known = ids & self._current(db)[2].keys()
+        missing = ids - known
+        if missing:
+            known |= {id_ for (id_,) in db.query(self.model.id).filter(self.model.id.in_(missing))}
+        return known
+
+    def bump(self, db: Session):
+        """Incrementa la versión del catálogo en la transacción de la escritura (ver `bump_version`)."""
+        bump_version(db, self.name)
+
+    def invalidate(self):
+        """Fuerza la comprobación de la versión en el siguiente acceso de este worker."""
+        self.checked_at = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.state[1]),
+            "version": self.state[0],
+            "poll_interval": settings.CATALOG_POLL_INTERVAL,
+            "hits": self.hits,
+            "reloads": self.reloads,
+        }
+
+
+input_catalog = CatalogCache("input", Input)
+warehouse_catalog = CatalogCache("warehouse", Warehouse)
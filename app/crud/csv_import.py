@@ -0,0 +1,99 @@
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.response_cache import response_cache
+from app.crud.pagination import fold_text
+
+
+def _save(db: Session, model, inserts: list, updates: list, catalog):
+    """Guarda inserciones y actualizaciones (y la versión del catálogo) en una transacción."""
+    if inserts:
+        db.execute(insert(model), inserts)
+    if updates:
+        db.execute(update(model), updates)
+    if catalog is not None and (inserts or updates):
+        catalog.bump(db)
+    db.commit()
+
+
+def upsert_catalog(db: Session, model, rows: list, seen: dict, unique: dict, catalog=None) -> dict:
+    """
+    Inserta o actualiza (por `name`) un bloque de filas de catálogo en una transacción.
+
+    - rows: [(línea, datos)] ya validados.
+    - seen: {campo: {valor: name}} de los bloques anteriores del mismo archivo.
+    - unique: {campo único distinto de name: mensaje si otro registro ya lo usa}.
+    - catalog: `CatalogCache` del modelo, cuya versión se incrementa en la misma transacción.
+
+    Hace una consulta IN por campo único para todo el bloque en lugar de una por fila. Los
+    valores se comparan sin mayúsculas ni acentos (`fold_text`), como los índices únicos de
+    MySQL: 'urea' actualiza 'Urea' en lugar de fallar al insertarse.
+    """
+    errors, pending = [], []
+    for line, data in rows:
+        repeated = next(
+            (field for field in ("name", *unique) if fold_text(data[field]) in seen.setdefault(field, {})),
+            None,
+        )
+        if repeated:
+            errors.append({"row": line, "error": f"Valor de '{repeated}' repetido en el archivo"})
+            continue
+        for field in ("name", *unique):
+            seen[field][fold_text(data[field])] = data["name"]
+        pending.append((line, data))
+
+    existing = {
+        fold_text(name): id_
+        for id_, name in db.query(model.id, model.name).filter(model.name.in_([data["name"] for _, data in pending]))
+    }
+    owners = {
+        field: {
+            fold_text(value): name
+            for value, name in db.query(getattr(model, field), model.name).filter(
+                getattr(model, field).in_([data[field] for _, data in pending])
+            )
+        }
+        for field in unique
+    }
+
+    inserts, updates = [], []
+    for line, data in pending:
+        name = fold_text(data["name"])
+        conflict = next(
+            (
+                field
+                for field in unique
+                if fold_text(owners[field].get(fold_text(data[field]), data["name"])) != name
+            ),
+            None,
+        )
+        if conflict:
+            errors.append({"row": line, "error": unique[conflict]})
+        elif name in existing:
+            updates.append((line, {"id": existing[name], **data}))
+        else:
+            inserts.append((line, data))
+
+    try:
+        _save(db, model, [data for _, data in inserts], [data for _, data in updates], catalog)
+        created, updated = len(inserts), len(updates)
+    except IntegrityError:
+        # Otro proceso escribió a la vez un valor único: se reintenta fila por fila para
+        # rechazar solo las filas en conflicto
+        db.rollback()
+        created = updated = 0
+        for line, data, is_insert in [(*row, True) for row in inserts] + [(*row, False) for row in updates]:
+            try:
+                _save(db, model, [data] if is_insert else [], [] if is_insert else [data], catalog)
+            except IntegrityError:
+                db.rollback()
+                errors.append({"row": line, "error": "Conflicto con otro registro al guardar; vuelva a importar la fila"})
+                continue
+            created += is_insert
+            updated += not is_insert
+
+    if catalog is not None and (created or updated):
+        catalog.invalidate()
+        response_cache.invalidate(catalog.name)
+    return {"created": created, "updated": updated, "errors": errors}
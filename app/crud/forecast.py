@@ -0,0 +1,137 @@
+from datetime import timedelta
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.db.config import settings
+from app.crud.report import bucket_expression
+from app.models.inventory import Inventory
+from app.models.stock_forecast import StockForecast
+from app.models.stock_level import StockLevel
+from app.schemas.report import ForecastFilter
+
+
+def consumption_statistics(pair_keys, day_offsets, quantities, days: int):
+    """
+    Consumo medio diario y tendencia de cada par, vectorizado sobre arrays columnares.
+
+    - pair_keys: array (n, 2) de (almacén, insumo); day_offsets: día de cada fila dentro de la
+      ventana (0..days-1); quantities: salidas de ese día.
+
+    Retorna (pares únicos, media diaria, pendiente de la recta de mínimos cuadrados).
+    """
+    # Clave única de 64 bits por par: np.unique sobre un array 1-D es mucho más rápido que con axis=0
+    pair_keys = np.asarray(pair_keys, dtype=np.int64)
+    keys, pair_index = np.unique((pair_keys[:, 0] << 32) | pair_keys[:, 1], return_inverse=True)
+    pairs = np.column_stack([keys >> 32, keys & 0xFFFFFFFF])
+    daily = np.bincount(
+        pair_index * days + day_offsets, weights=quantities, minlength=len(pairs) * days
+    ).reshape(len(pairs), days)
+    average = daily.mean(axis=1)
+    # Días centrados: la pendiente es sum(x * y) / sum(x^2)
+    x = np.arange(days, dtype=np.float64) - (days - 1) / 2
+    denominator = x @ x
+    trend = daily @ x / denominator if denominator else np.zeros(len(pairs))
+    return pairs, average, trend
+
+
+def compute_forecasts(db: Session, warehouse_id: int = None, input_id: int = None) -> list:
+    """
+    Calcula el pronóstico de todos los pares (o de uno, filtrando) con una consulta de salidas
+    agrupadas por día y otra de existencias (stock_level).
+    """
+    days = settings.FORECAST_WINDOW_DAYS
+    today = db.query(func.now()).scalar().date()
+    start = today - timedelta(days=days - 1)
+
+    day = bucket_expression(db.get_bind().dialect.name, "day")
+    consumption = (
+        select(Inventory.warehouse_id, Inventory.input_id, day, func.sum(Inventory.quantity))
+        .where(Inventory.is_input.is_(False), Inventory.created_at >= start)
+        .group_by(Inventory.warehouse_id, Inventory.input_id, day)
+    )
+    stock = select(StockLevel.warehouse_id, StockLevel.input_id, StockLevel.quantity)
+    if warehouse_id is not None:
+        consumption = consumption.where(Inventory.warehouse_id == warehouse_id)
+        stock = stock.where(StockLevel.warehouse_id == warehouse_id)
+    if input_id is not None:
+        consumption = consumption.where(Inventory.input_id == input_id)
+        stock = stock.where(StockLevel.input_id == input_id)
+
+    rows = db.execute(consumption).all()
+    statistics = {}
+    if rows:
+        warehouse_ids, input_ids, row_days, quantities = zip(*rows)
+        day_offsets = (np.array(row_days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+        pairs, average, trend = consumption_statistics(
+            np.column_stack([warehouse_ids, input_ids]),
+            np.clip(day_offsets, 0, days - 1),
+            np.array(quantities, dtype=np.float64),
+            days,
+        )
+        statistics = {
+            (int(pair[0]), int(pair[1])): (float(mean), float(slope))
+            for pair, mean, slope in zip(pairs, average, trend)
+        }
+
+    forecasts = []
+    for pair_warehouse_id, pair_input_id, quantity in db.execute(stock):
+        mean, slope = statistics.get((pair_warehouse_id, pair_input_id), (0.0, 0.0))
+        if quantity <= 0:
+            days_to_stockout = 0.0
+        elif mean > 0:
+            days_to_stockout = round(float(quantity) / mean, 2)
+        else:
+            days_to_stockout = None
+        forecasts.append({
+            "warehouse_id": pair_warehouse_id,
+            "input_id": pair_input_id,
+            "stock": quantity,
+            "avg_daily_consumption": round(mean, 3),
+            "trend": round(slope, 4),
+            "days_to_stockout": days_to_stockout,
+        })
+    return forecasts
+
+
+def refresh_forecasts(db: Session) -> int:
+    """Recalcula y reemplaza todos los pronósticos en una transacción."""
+    forecasts = compute_forecasts(db)
+    db.query(StockForecast).delete()
+    db.bulk_insert_mappings(StockForecast, forecasts)
+    db.commit()
+    return len(forecasts)
+
+
+def refresh_forecast(db: Session, warehouse_id: int, input_id: int):
+    """Recalcula al momento el pronóstico de un solo par."""
+    forecasts = compute_forecasts(db, warehouse_id, input_id)
+    db.query(StockForecast).filter(
+        StockForecast.warehouse_id == warehouse_id, StockForecast.input_id == input_id
+    ).delete()
+    db_forecast = StockForecast(**forecasts[0]) if forecasts else None
+    if db_forecast is not None:
+        db.add(db_forecast)
+    db.commit()
+    return db_forecast
+
+
+def forecasts_stale(db: Session) -> bool:
+    """True si algún pronóstico es anterior al último recálculo nocturno programado (reloj de la BD)."""
+    now = db.query(func.now()).scalar().replace(tzinfo=None)
+    oldest = db.query(func.min(StockForecast.computed_at)).scalar()
+    if oldest is None:
+        return True
+    refresh_at = now.replace(hour=settings.FORECAST_REFRESH_HOUR, minute=0, second=0, microsecond=0)
+    if now < refresh_at:
+        refresh_at -= timedelta(days=1)
+    return oldest.replace(tzinfo=None) < refresh_at
+
+
+def get_forecasts(db: Session, filters: ForecastFilter):
+    query = db.query(StockForecast)
+    if filters.warehouse_id is not None:
+        query = query.filter(StockForecast.warehouse_id == filters.warehouse_id)
+    if filters.input_id is not None:
+        query = query.filter(StockForecast.input_id == filters.input_id)
+    return query.order_by(StockForecast.warehouse_id, StockForecast.input_id).all()
@@ -2,55 +2,86 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from app.models.input import Input
-from app.schemas.input import InputCreate, InputUpdate
+from app.schemas.input import InputCreate, InputUpdate, InputFilter
+from app.core.response_cache import response_cache
+from app.crud.catalog import input_catalog
+from app.crud.pagination import fold_text, paginate_rows
+from app.crud.csv_import import upsert_catalog
+from app.crud.integrity import constraint_errors
+from app.crud.stock_level import delete_stock_rows
 
 
-def get_inputs(db: Session):
-    return db.query(Input).all()
+def name_matches(filters: InputFilter):
+    """Filtro por prefijo del nombre sobre las filas en memoria (sin distinguir mayúsculas ni acentos)."""
+    if not filters.name:
+        return None
+    prefix = fold_text(filters.name)
+    return lambda row: fold_text(row.name).startswith(prefix)
+
+
+def get_inputs(db: Session, filters: InputFilter):
+    # Servido desde la copia en memoria del catálogo (ver crud.catalog)
+    return paginate_rows(input_catalog.all(db), Input, filters.sort, filters, name_matches(filters))
+
+
+def get_input_catalog_version(db: Session):
+    return input_catalog.current_version(db)
+
+
+def get_inputs_version(db: Session, filters: InputFilter):
+    return input_catalog.last_modified(db, name_matches(filters))
 
 
 def get_input(db: Session, input_id: int):
-    return db.query(Input).filter(Input.id == input_id).first()
+    return input_catalog.get(db, input_id)
 
 
-def create_input(db: Session, input_data: InputCreate):
-    if db.query(Input).filter(Input.name == input_data.name).first():
-        raise HTTPException(status_code=400, detail="El nombre del insumo ya está en uso")
+# Índices únicos de Input y su mensaje de error
+UNIQUE_MESSAGES = {
+    "name": "El nombre del insumo ya está en uso",
+    "state": "El estado del insumo ya está en uso",
+}
 
-    if db.query(Input).filter(Input.state == input_data.state).first():
-        raise HTTPException(status_code=400, detail="El estado del insumo ya está en uso")
 
+def create_input(db: Session, input_data: InputCreate):
     db_input = Input(
         name=input_data.name,
         reference=input_data.reference,
         state=input_data.state
     )
-    db.add(db_input)
-    db.commit()
-    db.refresh(db_input)
+    with constraint_errors(db, UNIQUE_MESSAGES, "El insumo ya existe"):
+        db.add(db_input)
+        input_catalog.bump(db)
+        db.commit()
+    input_catalog.invalidate()
+    response_cache.invalidate("input")
     return db_input
 
 
+def import_inputs(db: Session, rows: list, seen: dict):
+    # Carga masiva desde CSV: inserta o actualiza por nombre
+    return upsert_catalog(db, Input, rows, seen, {"state": "El estado del insumo ya está en uso"}, input_catalog)
+
+
 def update_input(db: Session, input_id: int, input_update: InputUpdate):
     db_input = db.query(Input).filter(Input.id == input_id).first()
     if not db_input:
         raise HTTPException(status_code=404, detail="Insumo no encontrado")
 
-    if input_update.name and input_update.name != db_input.name:
-        if db.query(Input).filter(Input.name == input_update.name).first():
-            raise HTTPException(status_code=400, detail="El nombre del insumo ya está en uso")
+    if input_update.name:
         db_input.name = input_update.name
 
-    if input_update.state and input_update.state != db_input.state:
-        if db.query(Input).filter(Input.state == input_update.state).first():
-            raise HTTPException(status_code=400, detail="El estado del insumo ya está en uso")
+    if input_update.state:
         db_input.state = input_update.state
 
     if input_update.reference is not None:
         db_input.reference = input_update.reference
 
-    db.commit()
-    db.refresh(db_input)
+    with constraint_errors(db, UNIQUE_MESSAGES, "El insumo ya existe"):
+        input_catalog.bump(db)
+        db.commit()
+    input_catalog.invalidate()
+    response_cache.invalidate("input")
     return db_input
 
 
@@ -59,6 +90,11 @@ def delete_input(db: Session, input_id: int):
     if not db_input:
         raise HTTPException(status_code=404, detail="Insumo no encontrado")
 
-    db.delete(db_input)
-    db.commit()
+    with constraint_errors(db, {}, "El insumo tiene movimientos de inventario y no se puede eliminar"):
+        delete_stock_rows(db, input_id=input_id)
+        db.delete(db_input)
+        input_catalog.bump(db)
+        db.commit()
+    input_catalog.invalidate()
+    response_cache.invalidate("input", "inventory")
     return db_input
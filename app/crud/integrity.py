@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def _violated_column(exc: IntegrityError, columns) -> str:
+    """Columna afectada según el mensaje del motor (None si no se puede saber)."""
+    text = str(exc.orig)
+    if "for key '" in text:
+        # MySQL: "Duplicate entry 'x' for key 'users.ix_users_name'" -> solo el nombre del índice
+        text = text.rsplit("for key '", 1)[1]
+    for column in columns:
+        # SQLite: "UNIQUE constraint failed: users.name"; MySQL: "... FOREIGN KEY (`input_id`) ..."
+        if text.endswith(f".{column}") or f"_{column}'" in text or f"`{column}`" in text:
+            return column
+    return None
+
+
+@contextmanager
+def constraint_errors(db: Session, messages: dict, default: str):
+    """
+    Convierte las violaciones de índices únicos y claves foráneas en un 400.
+
+    La escritura se intenta directamente (sin SELECT previos de comprobación) y la base
+    de datos decide, lo que además es correcto con inserciones concurrentes.
+    `messages` asocia cada columna con el mensaje de error; `default` se usa si el
+    motor no indica la columna (p. ej. claves foráneas en SQLite).
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        db.rollback()
+        column = _violated_column(e, messages)
+        raise HTTPException(status_code=400, detail=messages[column] if column else default) from e
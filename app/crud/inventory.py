@@ -1,64 +1,214 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, load_only, selectinload
 from fastapi import HTTPException
 
+from app.core.response_cache import response_cache
+
 from app.models.inventory import Inventory
-from app.models.input import Input
-from app.models.warehouse import Warehouse
 from app.models.user import User
+from app.models.stock_level import StockLevel
+
+from app.schemas.inventory import InventoryBatch, InventoryCreate, InventoryUpdate, InventoryFilter, InventoryFilterBase, InventoryResponse, BalanceFilter, EXPAND_RELATIONS
+from app.crud.pagination import keyset_paginate
+from app.crud.alert import evaluate_alerts
+from app.crud.catalog import input_catalog, warehouse_catalog
+from app.crud.integrity import constraint_errors
+from app.crud.report import bump_movement_reports
+from app.crud.rows import response_columns, row_dicts, row_query
+from app.crud.stock_level import apply_checkpoint_delta, apply_stock_delta, get_balances_as_of, signed_quantity
 
-from app.schemas.inventory import InventoryCreate, InventoryUpdate
 
+# Columnas de la exportación, en orden
+EXPORT_COLUMNS = ["id", "input_id", "warehouse_id", "user_id", "is_input", "amount", "quantity", "created_at", "updated_at"]
 
-def get_inventories(db: Session):
-    return db.query(Inventory).all()
 
+def filter_inventories(query, filters: InventoryFilterBase):
+    """Aplica los filtros a un `Query` del ORM o a un `select()`."""
+    if filters.warehouse_id is not None:
+        query = query.filter(Inventory.warehouse_id == filters.warehouse_id)
+    if filters.input_id is not None:
+        query = query.filter(Inventory.input_id == filters.input_id)
+    if filters.user_id is not None:
+        query = query.filter(Inventory.user_id == filters.user_id)
+    if filters.is_input is not None:
+        query = query.filter(Inventory.is_input == filters.is_input)
+    if filters.created_from is not None:
+        query = query.filter(Inventory.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.filter(Inventory.created_at < filters.created_to)
+    return query
 
-def get_inventory(db: Session, inventory_id: int):
-    return db.query(Inventory).filter(Inventory.id == inventory_id).first()
 
+def expand_options(relations, fields=None) -> list:
+    """
+    Carga de las relaciones pedidas en `expand`: una consulta IN por relación para toda la
+    página (no una por fila), con cada almacén/insumo/usuario repetido cargado una sola vez.
+
+    Con `fields`, además, solo se leen esas columnas (más las claves de las relaciones).
+    """
+    options = [selectinload(getattr(Inventory, relation)) for relation in relations if relation in EXPAND_RELATIONS]
+    if fields:
+        keys = {f"{relation}_id" for relation in relations}
+        columns = response_columns(Inventory, InventoryResponse, set(fields) | keys)
+        options.append(load_only(*columns))
+    return options
+
+
+def sort_fields(filters: InventoryFilter):
+    """Campos pedidos más la columna de orden, necesaria para el cursor de la página."""
+    return filters.field_names and {*filters.field_names, filters.sort.lstrip("-")}
+
+
+def get_inventories(db: Session, filters: InventoryFilter):
+    fields = sort_fields(filters)
+    if filters.relations:
+        query = db.query(Inventory).options(*expand_options(filters.relations, fields))
+    else:
+        # Sin relaciones basta con las columnas: tuplas sin hidratar instancias del ORM
+        query = row_query(db, Inventory, InventoryResponse, fields)
+    items, next_cursor = keyset_paginate(filter_inventories(query, filters), Inventory, filters.sort, filters)
+    return (items if filters.relations else row_dicts(items)), next_cursor
+
+
+def get_inventories_version(db: Session, filters: InventoryFilterBase) -> tuple:
+    """(conteo, último updated_at) de los movimientos del filtro, para ETag/Last-Modified."""
+    return tuple(filter_inventories(db.query(func.count(Inventory.id), func.max(Inventory.updated_at)), filters).one())
+
+
+def get_inventory_version(db: Session, inventory_id: int):
+    return db.query(Inventory.updated_at).filter(Inventory.id == inventory_id).scalar()
+
+
+def export_inventories_statement(filters: InventoryFilterBase):
+    # Solo columnas (tuplas), sin instancias del ORM
+    statement = select(*[getattr(Inventory, column) for column in EXPORT_COLUMNS])
+    return filter_inventories(statement, filters).order_by(Inventory.id)
 
-def create_inventory(db: Session, inventory: InventoryCreate):
-    # Validar existencia de Input
-    if not db.query(Input).filter(Input.id == inventory.input_id).first():
-        raise HTTPException(status_code=400, detail="El insumo especificado no existe")
 
-    # Validar existencia de Warehouse
-    if not db.query(Warehouse).filter(Warehouse.id == inventory.warehouse_id).first():
-        raise HTTPException(status_code=400, detail="El almacén especificado no existe")
+def get_balances(db: Session, filters: BalanceFilter):
+    if filters.as_of is not None:
+        return get_balances_as_of(db, filters.as_of, filters.warehouse_id, filters.input_id)
+    # Lectura directa de stock_level (búsqueda por clave primaria/índice)
+    query = db.query(StockLevel.warehouse_id, StockLevel.input_id, StockLevel.quantity)
+    if filters.warehouse_id is not None:
+        query = query.filter(StockLevel.warehouse_id == filters.warehouse_id)
+    if filters.input_id is not None:
+        query = query.filter(StockLevel.input_id == filters.input_id)
+    return query.order_by(StockLevel.warehouse_id, StockLevel.input_id).all()
 
+
+def get_inventory(db: Session, inventory_id: int, relations=(), fields=None):
+    return db.query(Inventory).options(*expand_options(relations, fields)).filter(Inventory.id == inventory_id).first()
+
+
+# Claves foráneas de Inventory y su mensaje de error
+FOREIGN_KEY_MESSAGES = {
+    "input_id": "El insumo especificado no existe",
+    "warehouse_id": "El almacén especificado no existe",
+    "user_id": "El usuario especificado no existe",
+}
+FOREIGN_KEY_DEFAULT = "El insumo, almacén o usuario especificado no existe"
+
+
+def create_inventory(db: Session, inventory: InventoryCreate):
     db_inventory = Inventory(
         input_id=inventory.input_id,
         warehouse_id=inventory.warehouse_id,
         user_id=inventory.user_id,
         is_input=inventory.is_input,
-        amount=inventory.amount
+        amount=inventory.amount,
+        quantity=inventory.quantity
     )
-    db.add(db_inventory)
-    db.commit()
-    db.refresh(db_inventory)
+    with constraint_errors(db, FOREIGN_KEY_MESSAGES, FOREIGN_KEY_DEFAULT):
+        db.add(db_inventory)
+        apply_stock_delta(db, inventory.warehouse_id, inventory.input_id, signed_quantity(inventory.is_input, inventory.quantity))
+        evaluate_alerts(db, [(inventory.warehouse_id, inventory.input_id)])
+        bump_movement_reports(db)
+        db.commit()
+    response_cache.invalidate("inventory")
     return db_inventory
 
 
+def existing_ids(db: Session, model, ids: set) -> set:
+    """Ids de `ids` que existen en la tabla de `model` (una sola consulta IN)."""
+    if not ids:
+        return set()
+    return {id_ for (id_,) in db.query(model.id).filter(model.id.in_(ids))}
+
+
+def create_inventories(db: Session, batch: InventoryBatch):
+    """
+    Registra un lote de movimientos en una sola transacción.
+
+    Valida los ids referenciados (insumos y almacenes en la caché de catálogos, usuarios con
+    una consulta IN), inserta con un único INSERT múltiple (executemany) y actualiza
+    stock_level una vez por (almacén, insumo).
+    """
+    inputs = input_catalog.existing_ids(db, {item.input_id for item in batch.items})
+    warehouses = warehouse_catalog.existing_ids(db, {item.warehouse_id for item in batch.items})
+    users = existing_ids(db, User, {item.user_id for item in batch.items})
+
+    results, rows = [], []
+    for index, item in enumerate(batch.items):
+        error = None
+        if item.input_id not in inputs:
+            error = "El insumo especificado no existe"
+        elif item.warehouse_id not in warehouses:
+            error = "El almacén especificado no existe"
+        elif item.user_id not in users:
+            error = "El usuario especificado no existe"
+        results.append({"index": index, "created": error is None, "error": error})
+        if error is None:
+            rows.append(item.model_dump())
+
+    failed = len(batch.items) - len(rows)
+    if failed and batch.mode == "all_or_nothing":
+        for result in results:
+            result["created"] = False
+        return {"created": 0, "failed": failed, "results": results}
+
+    if rows:
+        # Un insumo/almacén borrado en otro worker aún puede figurar en la caché: lo rechaza la clave foránea
+        with constraint_errors(db, FOREIGN_KEY_MESSAGES, FOREIGN_KEY_DEFAULT):
+            statement = insert(Inventory)
+            if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+                statement = statement.returning(Inventory.id, sort_by_parameter_order=True)
+                ids = iter(db.execute(statement, rows).scalars().all())
+                for result in results:
+                    if result["created"]:
+                        result["id"] = next(ids)
+            else:
+                db.execute(statement, rows)
+
+            deltas = {}
+            for row in rows:
+                key = (row["warehouse_id"], row["input_id"])
+                deltas[key] = deltas.get(key, 0) + signed_quantity(row["is_input"], row["quantity"])
+            for (warehouse_id, input_id), delta in sorted(deltas.items()):
+                apply_stock_delta(db, warehouse_id, input_id, delta)
+            evaluate_alerts(db, deltas)
+            bump_movement_reports(db)
+            db.commit()
+        response_cache.invalidate("inventory")
+
+    return {"created": len(rows), "failed": failed, "results": results}
+
+
 def update_inventory(db: Session, inventory_id: int, inventory_update: InventoryUpdate):
-    db_inventory = db.query(Inventory).filter(Inventory.id == inventory_id).first()
+    db_inventory = db.query(Inventory).filter(Inventory.id == inventory_id).with_for_update().first()
     if not db_inventory:
         raise HTTPException(status_code=404, detail="Registro de inventario no encontrado")
 
-    # Validar input_id si se actualiza
+    # Movimiento previo, para revertirlo en stock_level
+    previous = (db_inventory.warehouse_id, db_inventory.input_id, signed_quantity(db_inventory.is_input, db_inventory.quantity))
+
     if inventory_update.input_id is not None:
-        if not db.query(Input).filter(Input.id == inventory_update.input_id).first():
-            raise HTTPException(status_code=400, detail="El insumo especificado no existe")
         db_inventory.input_id = inventory_update.input_id
 
-    # Validar warehouse_id si se actualiza
     if inventory_update.warehouse_id is not None:
-        if not db.query(Warehouse).filter(Warehouse.id == inventory_update.warehouse_id).first():
-            raise HTTPException(status_code=400, detail="El almacén especificado no existe")
         db_inventory.warehouse_id = inventory_update.warehouse_id
-    
+
     if inventory_update.user_id is not None:
-        if not db.query(User).filter(User.id == inventory_update.user_id).first():
-            raise HTTPException(status_code=400, detail="El usuario especificado no existe")    
         db_inventory.user_id = inventory_update.user_id
 
     if inventory_update.is_input is not None:
@@ -67,16 +217,35 @@ def update_inventory(db: Session, inventory_id: int, inventory_update: Inventory
     if inventory_update.amount is not None:
         db_inventory.amount = inventory_update.amount
 
-    db.commit()
-    db.refresh(db_inventory)
+    if inventory_update.quantity is not None:
+        db_inventory.quantity = inventory_update.quantity
+
+    # Revertir el movimiento previo y aplicar el nuevo (en orden de clave, para evitar interbloqueos)
+    deltas = {previous[:2]: -previous[2]}
+    current = (db_inventory.warehouse_id, db_inventory.input_id)
+    deltas[current] = deltas.get(current, 0) + signed_quantity(db_inventory.is_input, db_inventory.quantity)
+    with constraint_errors(db, FOREIGN_KEY_MESSAGES, FOREIGN_KEY_DEFAULT):
+        for (warehouse_id, input_id), delta in sorted(deltas.items()):
+            apply_stock_delta(db, warehouse_id, input_id, delta)
+            apply_checkpoint_delta(db, warehouse_id, input_id, db_inventory.created_at, delta)
+        evaluate_alerts(db, deltas)
+        bump_movement_reports(db)
+        db.commit()
+    response_cache.invalidate("inventory")
     return db_inventory
 
 
 def delete_inventory(db: Session, inventory_id: int):
-    db_inventory = db.query(Inventory).filter(Inventory.id == inventory_id).first()
+    db_inventory = db.query(Inventory).filter(Inventory.id == inventory_id).with_for_update().first()
     if not db_inventory:
         raise HTTPException(status_code=404, detail="Registro de inventario no encontrado")
 
     db.delete(db_inventory)
+    delta = -signed_quantity(db_inventory.is_input, db_inventory.quantity)
+    apply_stock_delta(db, db_inventory.warehouse_id, db_inventory.input_id, delta)
+    apply_checkpoint_delta(db, db_inventory.warehouse_id, db_inventory.input_id, db_inventory.created_at, delta)
+    evaluate_alerts(db, [(db_inventory.warehouse_id, db_inventory.input_id)])
+    bump_movement_reports(db)
     db.commit()
+    response_cache.invalidate("inventory")
     return db_inventory
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.db.config import settings
+from app.models.email_outbox import EmailOutbox
+
+
+def enqueue_email(db: Session, subject: str, recipients: list, body: str):
+    """Agrega un correo al outbox. No hace commit: se confirma junto con el cambio que lo origina."""
+    db.add(EmailOutbox(subject=subject, recipients=",".join(recipients), body=body))
+
+
+def claim_emails(db: Session, limit: int) -> list:
+    """
+    Toma hasta `limit` correos pendientes cuyo reintento ya venció.
+
+    Los aplaza OUTBOX_LEASE segundos para que otro worker no los tome mientras se envían
+    (SKIP LOCKED evita esperar por las filas que otro worker está reclamando).
+    """
+    now = db.query(func.now()).scalar()
+    emails = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for email in emails:
+        email.next_attempt_at = now + timedelta(seconds=settings.OUTBOX_LEASE)
+    db.commit()
+    return emails
+
+
+def complete_emails(db: Session, sent_ids: list, failures: dict):
+    """
+    Elimina los enviados y reprograma los fallidos con espera exponencial.
+
+    - failures: {id: (mensaje de error, permanente)}. Los permanentes, o los que agotan
+      OUTBOX_MAX_ATTEMPTS, pasan a 'dead'.
+    """
+    if sent_ids:
+        db.query(EmailOutbox).filter(EmailOutbox.id.in_(sent_ids)).delete(synchronize_session=False)
+    if failures:
+        now = db.query(func.now()).scalar()
+        for email in db.query(EmailOutbox).filter(EmailOutbox.id.in_(failures)):
+            error, permanent = failures[email.id]
+            email.attempts += 1
+            email.last_error = error[:1000]
+            if permanent or email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                email.status = "dead"
+            else:
+                delay = min(settings.OUTBOX_BACKOFF_BASE * 2 ** (email.attempts - 1), 3600)
+                email.next_attempt_at = now + timedelta(seconds=delay)
+    db.commit()
+
+
+def outbox_status(db: Session) -> dict:
+    counts = dict(db.query(EmailOutbox.status, func.count()).group_by(EmailOutbox.status))
+    oldest = db.query(func.min(EmailOutbox.created_at)).filter(EmailOutbox.status == "pending").scalar()
+    return {"pending": counts.get("pending", 0), "dead": counts.get("dead", 0), "oldest_pending": oldest}
@@ -0,0 +1,107 @@
+import base64
+import json
+import unicodedata
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+from app.schemas.pagination import PageParams
+
+
+def encode_cursor(sort: str, value, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, column):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort:
+            raise ValueError(sort)
+        value = payload["v"]
+        if column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def keyset_paginate(query, model, sort: str, page: PageParams):
+    """
+    Pagina `query` por keyset sobre (columna de orden, id).
+
+    `sort` es el nombre de la columna, con prefijo '-' para orden descendente. En vez de
+    OFFSET se filtra por la última fila de la página anterior (codificada en el cursor),
+    así cada página cuesta lo mismo sin importar en qué posición esté.
+
+    Retorna:
+    - (list, Optional[str]): Las filas de la página y el cursor de la siguiente (None si es la última).
+    """
+    descending = sort.startswith("-")
+    column = getattr(model, sort.lstrip("-"))
+
+    if page.cursor:
+        value, last_id = decode_cursor(page.cursor, sort, column)
+        if column is model.id:
+            condition = model.id < last_id if descending else model.id > last_id
+        elif descending:
+            condition = or_(column < value, and_(column == value, model.id < last_id))
+        else:
+            condition = or_(column > value, and_(column == value, model.id > last_id))
+        query = query.filter(condition)
+
+    order = [column] if column is model.id else [column, model.id]
+    order = [c.desc() if descending else c.asc() for c in order]
+    rows = query.order_by(*order).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), last.id)
+    return rows, next_cursor
+
+
+def fold_text(value: str) -> str:
+    """
+    Texto sin mayúsculas ni acentos ('Café' -> 'cafe'), para comparar como la intercalación
+    por defecto de MySQL (utf8mb4_0900_ai_ci). Con SQLite (intercalación binaria) el orden
+    y los filtros de la base de datos sí distinguen mayúsculas y acentos.
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _sort_value(value):
+    # Los textos se comparan como en la intercalación de la base de datos (ver fold_text)
+    return fold_text(value) if isinstance(value, str) else value
+
+
+def paginate_rows(rows: list, model, sort: str, page: PageParams, matches=None):
+    """
+    Equivalente en memoria de `keyset_paginate` para filas ya cargadas (catálogos en caché).
+
+    Mismo orden (columna de orden, id), mismo formato de cursor y mismo resultado:
+    (filas de la página, cursor de la siguiente o None).
+    """
+    descending = sort.startswith("-")
+    column = getattr(model, sort.lstrip("-"))
+    key = lambda row: (_sort_value(getattr(row, column.key)), row.id)
+
+    if matches is not None:
+        rows = [row for row in rows if matches(row)]
+    rows = sorted(rows, key=key, reverse=descending)
+
+    if page.cursor:
+        value, last_id = decode_cursor(page.cursor, sort, column)
+        last = (_sort_value(value), last_id)
+        rows = [row for row in rows if (key(row) < last if descending else key(row) > last)]
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), last.id)
+    return rows, next_cursor
@@ -0,0 +1,137 @@
+from decimal import Decimal
+from itertools import accumulate, groupby
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.db.config import settings
+from app.crud.catalog import bump_version, get_version
+from app.models.inventory import Inventory
+from app.schemas.report import MovementReportFilter
+
+# Filas del GROUP BY por (versión de los movimientos, filtros, periodo); el post-proceso se
+# aplica en cada petición. La versión es la fila "movements" de catalog_version, compartida
+# por todos los workers: un movimiento nuevo cambia la clave en todos ellos
+MOVEMENTS_VERSION = "movements"
+report_cache = TTLCache("movement_reports", maxsize=settings.REPORT_CACHE_SIZE, ttl=settings.REPORT_CACHE_TTL)
+
+GROUP_COLUMNS = {
+    "warehouse": ("warehouse_id",),
+    "input": ("input_id",),
+    "warehouse_input": ("warehouse_id", "input_id"),
+}
+
+QUANTITY_SCALE = Decimal("0.001")
+
+
+def bucket_expression(dialect: str, bucket: str):
+    """Inicio del periodo de `created_at` (día, lunes de la semana o día 1 del mes), según el motor."""
+    column = Inventory.created_at
+    if dialect == "mysql":
+        if bucket == "week":
+            return func.subdate(func.date(column), func.weekday(column))
+        if bucket == "month":
+            return func.date_format(column, "%Y-%m-01")
+        return func.date(column)
+    if bucket == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.date(column, "start of month")
+    return func.date(column)
+
+
+def _cache_key(version: int, filters: MovementReportFilter) -> tuple:
+    return (
+        version,
+        filters.bucket,
+        filters.group_by,
+        filters.warehouse_id,
+        filters.input_id,
+        filters.created_from,
+        filters.created_to,
+    )
+
+
+def _query_movement_report(db: Session, filters: MovementReportFilter) -> list:
+    bucket = bucket_expression(db.get_bind().dialect.name, filters.bucket).label("bucket")
+    columns = [getattr(Inventory, column) for column in GROUP_COLUMNS[filters.group_by]]
+    query = db.query(
+        bucket,
+        *columns,
+        func.sum(case((Inventory.is_input, Inventory.quantity), else_=0)).label("quantity_in"),
+        func.sum(case((Inventory.is_input, 0), else_=Inventory.quantity)).label("quantity_out"),
+        func.count().label("movements"),
+    )
+    if filters.warehouse_id is not None:
+        query = query.filter(Inventory.warehouse_id == filters.warehouse_id)
+    if filters.input_id is not None:
+        query = query.filter(Inventory.input_id == filters.input_id)
+    if filters.created_from is not None:
+        query = query.filter(Inventory.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.filter(Inventory.created_at < filters.created_to)
+    query = query.group_by(*columns, bucket).order_by(*columns, bucket)
+
+    rows = []
+    for row in query:
+        data = row._asdict()
+        data["quantity_in"] = Decimal(str(data["quantity_in"] or 0)).quantize(QUANTITY_SCALE)
+        data["quantity_out"] = Decimal(str(data["quantity_out"] or 0)).quantize(QUANTITY_SCALE)
+        data["net"] = data["quantity_in"] - data["quantity_out"]
+        rows.append(data)
+    return rows
+
+
+def _running_and_average(net: list, running: bool, window: int):
+    """
+    Saldo acumulado y media móvil de una serie, en Decimal (exacto, como las columnas
+    Numeric). Las series son pequeñas (un valor por periodo), así que basta con Python.
+    """
+    totals = averages = None
+    if running:
+        totals = list(accumulate(net))
+    if window:
+        averages, total = [], Decimal(0)
+        for i, value in enumerate(net):
+            total += value
+            if i >= window:
+                total -= net[i - window]
+            averages.append((total / window).quantize(QUANTITY_SCALE) if i >= window - 1 else None)
+    return totals, averages
+
+
+def post_process(rows: list, filters: MovementReportFilter) -> list:
+    rows = [dict(row) for row in rows]  # no modificar las filas de la caché
+    if not (filters.running or filters.moving_average):
+        return rows
+    columns = GROUP_COLUMNS[filters.group_by]
+    for _, series in groupby(rows, key=lambda row: tuple(row[column] for column in columns)):
+        series = list(series)
+        totals, averages = _running_and_average(
+            [row["net"] for row in series], filters.running, filters.moving_average
+        )
+        for i, row in enumerate(series):
+            if totals is not None:
+                row["running_net"] = totals[i]
+            if averages is not None:
+                row["moving_average_net"] = averages[i]
+    return rows
+
+
+def get_movement_report(db: Session, filters: MovementReportFilter) -> list:
+    """Entradas y salidas por periodo agrupadas en la base de datos, con caché por (versión, filtros, periodo)."""
+    key = _cache_key(get_version(db, MOVEMENTS_VERSION), filters)
+    rows = report_cache.get(key)
+    if rows is None:
+        rows = _query_movement_report(db, filters)
+        report_cache.set(key, rows)
+    return post_process(rows, filters)
+
+
+def bump_movement_reports(db: Session):
+    """
+    Invalida los reportes en caché de todos los workers: incrementa la versión de los
+    movimientos. Llamar en la transacción que escribe movimientos, antes del commit; las
+    entradas anteriores dejan de consultarse y expiran por TTL/LRU.
+    """
+    bump_version(db, MOVEMENTS_VERSION)
@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Session
+
+
+def response_columns(model, schema, fields=None) -> list:
+    """
+    Columnas de `model` que aparecen en el esquema de respuesta `schema`, en su orden.
+    Con `fields`, solo esas (más el id).
+    """
+    columns = model.__table__.columns
+    return [
+        getattr(model, field)
+        for field in schema.model_fields
+        if field in columns and (fields is None or field in fields or field == "id")
+    ]
+
+
+def row_query(db: Session, model, schema, fields=None):
+    """
+    Consulta de solo lectura para listados: devuelve tuplas (`Row`) con las columnas de la
+    respuesta en lugar de instancias del ORM.
+
+    No pasa por el identity map ni el seguimiento de cambios de la sesión. Se puede filtrar,
+    ordenar y paginar igual que `db.query(model)`; el resultado se entrega con `row_dicts`.
+    """
+    return db.query(*response_columns(model, schema, fields))
+
+
+def row_dicts(rows) -> list:
+    """
+    Filas como diccionarios para el serializador de la respuesta: validar un dict es mucho
+    más barato que leer cada campo como atributo de un `Row` (`from_attributes`).
+    """
+    return [row._asdict() for row in rows]
@@ -0,0 +1,238 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.response_cache import response_cache
+
+from app.models.inventory import Inventory
+from app.models.stock_alert import StockAlert, StockThreshold
+from app.models.stock_forecast import StockForecast
+from app.models.stock_level import StockCheckpoint, StockLevel
+
+
+# Entradas suman, salidas restan
+SIGNED_QUANTITY = case((Inventory.is_input, Inventory.quantity), else_=-Inventory.quantity)
+
+
+def signed_quantity(is_input: bool, quantity) -> Decimal:
+    return Decimal(quantity) if is_input else -Decimal(quantity)
+
+
+def delete_stock_rows(db: Session, **criteria):
+    """
+    Elimina las filas por (almacén, insumo) de un almacén o insumo que se va a eliminar:
+    existencias, checkpoints, mínimos, alertas y pronósticos. No hace commit; si aún hay
+    movimientos, la clave foránea rechaza la eliminación y se deshace todo.
+    """
+    for model in (StockLevel, StockCheckpoint, StockThreshold, StockAlert, StockForecast):
+        db.query(model).filter_by(**criteria).delete(synchronize_session=False)
+
+
+def apply_stock_delta(db: Session, warehouse_id: int, input_id: int, delta: Decimal):
+    """
+    Suma `delta` a las existencias de (almacén, insumo) con un único upsert atómico.
+
+    No hace commit: se ejecuta dentro de la transacción del movimiento de inventario,
+    así ambos se confirman o se deshacen juntos.
+    """
+    if not delta:
+        return
+    values = {"warehouse_id": warehouse_id, "input_id": input_id, "quantity": delta}
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql_insert(StockLevel).values(**values)
+        statement = statement.on_duplicate_key_update(
+            quantity=StockLevel.quantity + statement.inserted.quantity,
+            updated_at=func.now(),
+        )
+    else:
+        statement = sqlite_insert(StockLevel).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[StockLevel.warehouse_id, StockLevel.input_id],
+            set_={"quantity": StockLevel.quantity + statement.excluded.quantity, "updated_at": func.now()},
+        )
+    db.execute(statement)
+
+
+def compute_stock_levels(db: Session, before: datetime = None) -> dict:
+    """Recalcula las existencias desde el historial completo de movimientos (anteriores a `before`)."""
+    query = db.query(Inventory.warehouse_id, Inventory.input_id, func.sum(SIGNED_QUANTITY))
+    if before is not None:
+        query = query.filter(Inventory.created_at < before)
+    rows = query.group_by(Inventory.warehouse_id, Inventory.input_id).all()
+    return {(warehouse_id, input_id): Decimal(total or 0) for warehouse_id, input_id, total in rows}
+
+
+def verify_stock_levels(db: Session) -> list:
+    """
+    Compara `stock_level` con el recálculo completo.
+
+    Retorna:
+    - list: Una entrada por cada (almacén, insumo) con diferencia (vacía si no hay deriva).
+    """
+    expected = compute_stock_levels(db)
+    actual = {
+        (row.warehouse_id, row.input_id): Decimal(row.quantity)
+        for row in db.query(StockLevel.warehouse_id, StockLevel.input_id, StockLevel.quantity)
+    }
+    drift = []
+    for key in sorted(expected.keys() | actual.keys()):
+        expected_quantity = expected.get(key, Decimal(0))
+        actual_quantity = actual.get(key, Decimal(0))
+        if expected_quantity != actual_quantity:
+            drift.append({
+                "warehouse_id": key[0],
+                "input_id": key[1],
+                "expected": expected_quantity,
+                "actual": actual_quantity,
+            })
+    return drift
+
+
+def rebuild_stock_levels(db: Session) -> list:
+    """
+    Reconstruye `stock_level` desde cero en una transacción y devuelve la deriva encontrada.
+
+    Los movimientos que se registren mientras se ejecuta pueden perderse: usar en una
+    ventana sin escrituras.
+    """
+    drift = verify_stock_levels(db)
+    db.query(StockLevel).delete()
+    db.bulk_insert_mappings(
+        StockLevel,
+        [
+            {"warehouse_id": warehouse_id, "input_id": input_id, "quantity": quantity}
+            for (warehouse_id, input_id), quantity in compute_stock_levels(db).items()
+        ],
+    )
+    db.commit()
+    response_cache.invalidate("inventory")
+    return drift
+
+
+def apply_checkpoint_delta(db: Session, warehouse_id: int, input_id: int, since: datetime, delta: Decimal):
+    """
+    Corrige los checkpoints posteriores a un movimiento que se modifica o elimina
+    (los que lo incluían: as_of > created_at). No hace commit.
+    """
+    if not delta:
+        return
+    db.query(StockCheckpoint).filter(
+        StockCheckpoint.warehouse_id == warehouse_id,
+        StockCheckpoint.input_id == input_id,
+        StockCheckpoint.as_of > since,
+    ).update({StockCheckpoint.quantity: StockCheckpoint.quantity + delta}, synchronize_session=False)
+
+
+def get_balances_as_of(db: Session, as_of: datetime, warehouse_id: int = None, input_id: int = None, inclusive: bool = True):
+    """
+    Existencias a una fecha: checkpoint más cercano (as_of <= fecha) de cada par más los
+    movimientos posteriores a él. Los pares sin checkpoint se suman desde el inicio.
+
+    Con `inclusive` cuenta los movimientos con created_at <= as_of; si no, solo los anteriores.
+    """
+    latest = select(
+        StockCheckpoint.warehouse_id,
+        StockCheckpoint.input_id,
+        func.max(StockCheckpoint.as_of).label("as_of"),
+    ).where(StockCheckpoint.as_of <= as_of)
+    if warehouse_id is not None:
+        latest = latest.where(StockCheckpoint.warehouse_id == warehouse_id)
+    if input_id is not None:
+        latest = latest.where(StockCheckpoint.input_id == input_id)
+    latest = latest.group_by(StockCheckpoint.warehouse_id, StockCheckpoint.input_id).subquery()
+
+    balances = {
+        (row.warehouse_id, row.input_id): Decimal(row.quantity)
+        for row in db.query(StockCheckpoint.warehouse_id, StockCheckpoint.input_id, StockCheckpoint.quantity).join(
+            latest,
+            and_(
+                StockCheckpoint.warehouse_id == latest.c.warehouse_id,
+                StockCheckpoint.input_id == latest.c.input_id,
+                StockCheckpoint.as_of == latest.c.as_of,
+            ),
+        )
+    }
+
+    # Movimientos posteriores al checkpoint de su par (o todos, si el par no tiene)
+    deltas = (
+        db.query(Inventory.warehouse_id, Inventory.input_id, func.sum(SIGNED_QUANTITY))
+        .outerjoin(
+            latest,
+            and_(Inventory.warehouse_id == latest.c.warehouse_id, Inventory.input_id == latest.c.input_id),
+        )
+        .filter(Inventory.created_at <= as_of if inclusive else Inventory.created_at < as_of)
+        .filter(or_(latest.c.as_of.is_(None), Inventory.created_at >= latest.c.as_of))
+    )
+    if warehouse_id is not None:
+        deltas = deltas.filter(Inventory.warehouse_id == warehouse_id)
+    if input_id is not None:
+        deltas = deltas.filter(Inventory.input_id == input_id)
+    for pair_warehouse_id, pair_input_id, total in deltas.group_by(Inventory.warehouse_id, Inventory.input_id):
+        key = (pair_warehouse_id, pair_input_id)
+        balances[key] = balances.get(key, Decimal(0)) + Decimal(total or 0)
+
+    return [
+        {"warehouse_id": key[0], "input_id": key[1], "quantity": quantity}
+        for key, quantity in sorted(balances.items())
+    ]
+
+
+def checkpoint_boundary(db: Session, interval: int, settle: int) -> datetime:
+    """Último inicio de periodo de `interval` segundos cerrado hace al menos `settle` segundos (reloj de la BD)."""
+    now = db.query(func.now()).scalar().replace(tzinfo=None)
+    epoch = datetime(1970, 1, 1)
+    elapsed = (now - epoch).total_seconds() - settle
+    return epoch + timedelta(seconds=elapsed // interval * interval)
+
+
+def build_checkpoint(db: Session, as_of: datetime) -> int:
+    """
+    Guarda un checkpoint en `as_of` para los pares con movimientos desde el checkpoint
+    anterior. Retorna el número de pares guardados (0 si ya existía uno igual o posterior).
+    """
+    last = db.query(func.max(StockCheckpoint.as_of)).scalar()
+    if last is not None and last.replace(tzinfo=None) >= as_of:
+        return 0
+
+    changed = db.query(Inventory.warehouse_id, Inventory.input_id).filter(Inventory.created_at < as_of)
+    if last is not None:
+        changed = changed.filter(Inventory.created_at >= last)
+    changed = set(changed.distinct())
+
+    rows = [
+        {**balance, "as_of": as_of}
+        for balance in get_balances_as_of(db, as_of, inclusive=False)
+        if (balance["warehouse_id"], balance["input_id"]) in changed
+    ]
+    db.bulk_insert_mappings(StockCheckpoint, rows)
+    db.commit()
+    return len(rows)
+
+
+def verify_checkpoints(db: Session, fix: bool = False) -> list:
+    """
+    Compara cada checkpoint con el recálculo completo hasta su fecha. Con `fix` elimina los
+    que no coinciden (las consultas usan entonces el checkpoint anterior del par).
+    """
+    drift = []
+    for (as_of,) in db.query(StockCheckpoint.as_of).distinct().order_by(StockCheckpoint.as_of):
+        expected = compute_stock_levels(db, before=as_of)
+        for row in db.query(StockCheckpoint).filter(StockCheckpoint.as_of == as_of):
+            expected_quantity = expected.get((row.warehouse_id, row.input_id), Decimal(0))
+            if expected_quantity != Decimal(row.quantity):
+                drift.append({
+                    "warehouse_id": row.warehouse_id,
+                    "input_id": row.input_id,
+                    "as_of": as_of,
+                    "expected": expected_quantity,
+                    "actual": Decimal(row.quantity),
+                })
+                if fix:
+                    db.delete(row)
+    if fix:
+        db.commit()
+        response_cache.invalidate("inventory")
+    return drift
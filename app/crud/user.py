@@ -1,71 +1,101 @@
-from sqlalchemy.orm import Session
+import html
+
+from sqlalchemy.orm import Session, load_only
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserFilter, UserResponse
+from app.crud.pagination import keyset_paginate
+from app.crud.rows import response_columns, row_dicts, row_query
+from app.crud.integrity import constraint_errors
+from app.crud.outbox import enqueue_email
+from app.core.db.config import settings
 from fastapi import HTTPException
 import app.core.security as security
 
 
-def get_users(db: Session):
-    return db.query(User).all()
+def get_users(db: Session, filters: UserFilter):
+    # Solo las columnas de la respuesta (sin la contraseña), como tuplas
+    fields = filters.field_names and {*filters.field_names, filters.sort.lstrip("-")}
+    query = row_query(db, User, UserResponse, fields)
+    if filters.name:
+        query = query.filter(User.name.startswith(filters.name, autoescape=True))
+    items, next_cursor = keyset_paginate(query, User, filters.sort, filters)
+    return row_dicts(items), next_cursor
 
 
-def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+def get_user(db: Session, user_id: int, fields=None):
+    query = db.query(User)
+    if fields:
+        query = query.options(load_only(*response_columns(User, UserResponse, fields)))
+    return query.filter(User.id == user_id).first()
 
 
 def get_user_by_username(db: Session, name: str):
     return db.query(User).filter(User.name == name).first()
 
 
-def create_user(db: Session, user: UserCreate):
-    # Verificar nombre de usuario duplicado
-    if db.query(User).filter(User.name == user.name).first():
-        raise HTTPException(status_code=400, detail="El nombre de usuario ya está en uso")
-    
-    # Verificar identificación duplicada
-    if db.query(User).filter(User.identification == user.identification).first():
-        raise HTTPException(status_code=400, detail="La identificación ya está registrada")
+def get_token_version(db: Session, user_id: int):
+    return db.query(User.token_version).filter(User.id == user_id).scalar()
+
 
-    hashed_password = security.hash_password(user.password)
+# Índices únicos de User y su mensaje de error
+UNIQUE_MESSAGES = {
+    "name": "El nombre de usuario ya está en uso",
+    "identification": "La identificación ya está registrada",
+    "mail": "El correo electrónico ya está en uso",
+}
+
+
+def create_user(db: Session, user: UserCreate, hashed_password: str = None):
     db_user = User(
         name=user.name,
-        password=hashed_password,
+        password=hashed_password or security.hash_password(user.password),
         mail=user.mail,
         identification=user.identification,
         phone=user.phone,
         is_admin=user.is_admin or False,
-        cargo=user.cargo
+        cargo=user.cargo,
+        token_version=0
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    with constraint_errors(db, UNIQUE_MESSAGES, "El usuario ya existe"):
+        db.add(db_user)
+        # Aviso al administrador en la misma transacción. Sin la contraseña: el cuerpo queda
+        # guardado en email_outbox (y en copias de seguridad) hasta enviarse, o para siempre si falla
+        enqueue_email(
+            db,
+            "Nuevo Usuario Creado",
+            [settings.ADMIN_EMAIL],
+            f"""
+    <h2>Nuevo usuario creado</h2>
+    <p><b>Usuario:</b> {html.escape(user.name)}</p>
+    <p><b>Correo:</b> {html.escape(user.mail)}</p>
+    """,
+        )
+        db.commit()
     return db_user
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate):
+def update_user(db: Session, user_id: int, user_update: UserUpdate, hashed_password: str = None):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    # Validar nombre si cambia
-    if user_update.name and user_update.name != db_user.name:
-        if db.query(User).filter(User.name == user_update.name).first():
-            raise HTTPException(status_code=400, detail="El nombre de usuario ya está en uso")
+    previous_name = db_user.name
 
-    # Validar identificación si cambia
-    if user_update.identification and user_update.identification != db_user.identification:
-        if db.query(User).filter(User.identification == user_update.identification).first():
-            raise HTTPException(status_code=400, detail="La identificación ya está registrada")
-
-    if user_update.mail and user_update.mail != db_user.mail:
-        if db.query(User).filter(User.mail == user_update.mail).first():
-            raise HTTPException(status_code=400, detail="El correo electrónico ya está en uso")
+    # Revocar los tokens emitidos si cambian la contraseña, los permisos o el nombre
+    if (
+        user_update.password
+        or (user_update.is_admin is not None and user_update.is_admin != db_user.is_admin)
+        or (user_update.name and user_update.name != db_user.name)
+    ):
+        # Incremento en SQL (token_version = token_version + 1): dos actualizaciones a la vez
+        # no pueden escribir el mismo valor y dejar válidos los tokens emitidos entre ambas
+        db_user.token_version = User.token_version + 1
 
     # Actualizar campos si están presentes
     if user_update.name:
         db_user.name = user_update.name
     if user_update.password:
-        db_user.password = security.hash_password(user_update.password)
+        db_user.password = hashed_password or security.hash_password(user_update.password)
     if user_update.mail:
         db_user.mail = user_update.mail
     if user_update.identification:
@@ -77,16 +107,30 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate):
     if user_update.cargo:
         db_user.cargo = user_update.cargo
 
-    db.commit()
-    db.refresh(db_user)
+    with constraint_errors(db, UNIQUE_MESSAGES, "El usuario ya existe"):
+        db.commit()
+    # Versión ya confirmada en la base de datos (incluye los incrementos de otras peticiones)
+    db.refresh(db_user, ["token_version"])
+    security.principal_cache.delete(previous_name)
+    security.token_version_cache.set(db_user.id, db_user.token_version)
     return db_user
 
 
+def update_password_hash(db: Session, user_id: int, hashed_password: str):
+    # Rehash transparente en el login: no cambia la contraseña, no revoca tokens
+    db.query(User).filter(User.id == user_id).update({User.password: hashed_password})
+    db.commit()
+
+
 def delete_user(db: Session, user_id: int):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    db.delete(db_user)
-    db.commit()
+    name = db_user.name
+    with constraint_errors(db, {}, "El usuario tiene movimientos de inventario y no se puede eliminar"):
+        db.delete(db_user)
+        db.commit()
+    security.principal_cache.delete(name)
+    security.token_version_cache.delete(user_id)
     return db_user
@@ -1,47 +1,79 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.warehouse import Warehouse
-from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate
+from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate, WarehouseFilter
+from app.core.response_cache import response_cache
+from app.crud.catalog import warehouse_catalog
+from app.crud.pagination import fold_text, paginate_rows
+from app.crud.csv_import import upsert_catalog
+from app.crud.integrity import constraint_errors
+from app.crud.stock_level import delete_stock_rows
 
 
-def get_warehouses(db: Session):
-    return db.query(Warehouse).all()
+def name_matches(filters: WarehouseFilter):
+    """Filtro por prefijo del nombre sobre las filas en memoria (sin distinguir mayúsculas ni acentos)."""
+    if not filters.name:
+        return None
+    prefix = fold_text(filters.name)
+    return lambda row: fold_text(row.name).startswith(prefix)
+
+
+def get_warehouses(db: Session, filters: WarehouseFilter):
+    # Servido desde la copia en memoria del catálogo (ver crud.catalog)
+    return paginate_rows(warehouse_catalog.all(db), Warehouse, filters.sort, filters, name_matches(filters))
+
+
+def get_warehouse_catalog_version(db: Session):
+    return warehouse_catalog.current_version(db)
+
+
+def get_warehouses_version(db: Session, filters: WarehouseFilter):
+    return warehouse_catalog.last_modified(db, name_matches(filters))
 
 
 def get_warehouse(db: Session, warehouse_id: int):
-    return db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
+    return warehouse_catalog.get(db, warehouse_id)
 
 
-def create_warehouse(db: Session, warehouse: WarehouseCreate):
-    # Validar nombre duplicado
-    if db.query(Warehouse).filter(Warehouse.name == warehouse.name).first():
-        raise HTTPException(status_code=400, detail="El nombre del almacén ya está en uso")
+# Índices únicos de Warehouse y su mensaje de error
+UNIQUE_MESSAGES = {"name": "El nombre del almacén ya está en uso"}
+
 
+def create_warehouse(db: Session, warehouse: WarehouseCreate):
     db_warehouse = Warehouse(
         name=warehouse.name,
         reference=warehouse.reference
     )
-    db.add(db_warehouse)
-    db.commit()
-    db.refresh(db_warehouse)
+    with constraint_errors(db, UNIQUE_MESSAGES, "El almacén ya existe"):
+        db.add(db_warehouse)
+        warehouse_catalog.bump(db)
+        db.commit()
+    warehouse_catalog.invalidate()
+    response_cache.invalidate("warehouse")
     return db_warehouse
 
 
+def import_warehouses(db: Session, rows: list, seen: dict):
+    # Carga masiva desde CSV: inserta o actualiza por nombre
+    return upsert_catalog(db, Warehouse, rows, seen, {}, warehouse_catalog)
+
+
 def update_warehouse(db: Session, warehouse_id: int, update_data: WarehouseUpdate):
     db_warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
     if not db_warehouse:
         raise HTTPException(status_code=404, detail="Almacén no encontrado")
 
-    if update_data.name and update_data.name != db_warehouse.name:
-        if db.query(Warehouse).filter(Warehouse.name == update_data.name).first():
-            raise HTTPException(status_code=400, detail="El nombre del almacén ya está en uso")
+    if update_data.name:
         db_warehouse.name = update_data.name
 
     if update_data.reference is not None:
         db_warehouse.reference = update_data.reference
 
-    db.commit()
-    db.refresh(db_warehouse)
+    with constraint_errors(db, UNIQUE_MESSAGES, "El almacén ya existe"):
+        warehouse_catalog.bump(db)
+        db.commit()
+    warehouse_catalog.invalidate()
+    response_cache.invalidate("warehouse")
     return db_warehouse
 
 
@@ -50,6 +82,11 @@ def delete_warehouse(db: Session, warehouse_id: int):
     if not db_warehouse:
         raise HTTPException(status_code=404, detail="Almacén no encontrado")
 
-    db.delete(db_warehouse)
-    db.commit()
+    with constraint_errors(db, {}, "El almacén tiene movimientos de inventario y no se puede eliminar"):
+        delete_stock_rows(db, warehouse_id=warehouse_id)
+        db.delete(db_warehouse)
+        warehouse_catalog.bump(db)
+        db.commit()
+    warehouse_catalog.invalidate()
+    response_cache.invalidate("warehouse", "inventory")
     return db_warehouse
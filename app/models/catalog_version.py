@@ -0,0 +1,14 @@
+from sqlalchemy import Column, BigInteger, String
+from app.core.db.session import Base
+
+class CatalogVersion(Base):
+    """
+    Versión de cada catálogo (input, warehouse) y de los movimientos de inventario
+    (movements). Se incrementa en la misma transacción que cualquier escritura; cada worker
+    la consulta para saber si su copia en memoria sigue vigente (ver crud.catalog y
+    crud.report).
+    """
+    __tablename__ = "catalog_version"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
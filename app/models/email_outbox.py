@@ -0,0 +1,24 @@
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, func, Index
+from app.core.db.session import Base, BigIntegerPK
+
+class EmailOutbox(Base):
+    """
+    Correos pendientes de enviar. Se insertan en la misma transacción que el cambio que los
+    origina y los envía el remitente en segundo plano (app/core/email.OutboxSender).
+
+    Los enviados se eliminan; los que agotan los reintentos quedan con status 'dead' para
+    revisión. No guardar secretos (contraseñas) en el cuerpo.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index("ix_email_outbox_due", "status", "next_attempt_at"),)
+
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    subject = Column(String(255), nullable=False)
+    recipients = Column(Text, nullable=False)  # separados por comas
+    body = Column(Text, nullable=False)
+    status = Column(String(10), nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
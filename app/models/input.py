@@ -1,11 +1,16 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, func
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, func, Index
 from sqlalchemy.orm import relationship
-from app.core.db.session import Base
+from app.core.db.session import Base, BigIntegerPK
 
 class Input(Base):
     __tablename__ = "input"
+    # Orden/cursor del listado por (created_at, id)
+    __table_args__ = (Index("ix_input_created", "created_at", "id"),)
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # Devuelve en el INSERT/UPDATE los valores generados por el servidor (created_at, updated_at...)
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     name = Column(String(50), unique=True, index=True, nullable=False)
     reference = Column(String(255), nullable=False)
     state = Column(String(255), unique=True, index=True, nullable=False)
@@ -14,5 +19,7 @@ class Input(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    inventory = relationship("Inventory", back_populates="input")
+    # passive_deletes: no se cargan ni se anulan los movimientos al eliminar; la clave foránea
+    # rechaza eliminar un registro con movimientos (ver crud)
+    inventory = relationship("Inventory", back_populates="input", passive_deletes=True)
 
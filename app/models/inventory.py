@@ -1,16 +1,29 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, func, ForeignKey
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, func, ForeignKey, Index, Numeric
 from sqlalchemy.orm import relationship
-from app.core.db.session import Base
+from app.core.db.session import Base, BigIntegerPK
 
 class Inventory(Base):
     __tablename__ = "inventory"
+    # Índices para los filtros del listado + orden/cursor por (created_at, id).
+    # Cubren también las claves foráneas (input_id, warehouse_id, user_id van primero).
+    __table_args__ = (
+        Index("ix_inventory_warehouse_created", "warehouse_id", "created_at", "id"),
+        Index("ix_inventory_input_created", "input_id", "created_at", "id"),
+        Index("ix_inventory_user_created", "user_id", "created_at", "id"),
+        Index("ix_inventory_created", "created_at", "id"),
+    )
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    input_id = Column(BigInteger, ForeignKey('input.id'), nullable=False, index=True)
-    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), nullable=False, index=True)
-    user_id = Column(BigInteger, ForeignKey('users.id'), nullable=False, index=True)
+    # Devuelve en el INSERT/UPDATE los valores generados por el servidor (created_at, updated_at...)
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    input_id = Column(BigInteger, ForeignKey('input.id'), nullable=False)
+    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), nullable=False)
+    user_id = Column(BigInteger, ForeignKey('users.id'), nullable=False)
     is_input = Column(Boolean, default=True, nullable=False)
     amount = Column(String(50), nullable=False)
+    # Valor numérico de `amount`, para sumar existencias en la base de datos
+    quantity = Column(Numeric(14, 3), nullable=False, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, Numeric, DateTime, func, ForeignKey
+from app.core.db.session import Base
+
+class StockThreshold(Base):
+    """Existencia mínima por (almacén, insumo); por debajo se genera una alerta."""
+    __tablename__ = "stock_threshold"
+    __mapper_args__ = {"eager_defaults": True}
+
+    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), primary_key=True)
+    input_id = Column(BigInteger, ForeignKey('input.id'), primary_key=True)
+    minimum = Column(Numeric(16, 3), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class StockAlert(Base):
+    """
+    Alerta activa de existencias bajas: una fila por par mientras siga por debajo del mínimo
+    (las alertas repetidas se deduplican). `notified_at` es NULL hasta enviarse en el resumen.
+    """
+    __tablename__ = "stock_alert"
+    __mapper_args__ = {"eager_defaults": True}
+
+    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), primary_key=True)
+    input_id = Column(BigInteger, ForeignKey('input.id'), primary_key=True)
+    quantity = Column(Numeric(16, 3), nullable=False)
+    minimum = Column(Numeric(16, 3), nullable=False)
+    notified_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
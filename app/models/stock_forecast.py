@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, Numeric, Float, DateTime, func, ForeignKey
+from app.core.db.session import Base
+
+class StockForecast(Base):
+    """Pronóstico de consumo por (almacén, insumo), recalculado cada noche (ver crud.forecast)."""
+    __tablename__ = "stock_forecast"
+    __mapper_args__ = {"eager_defaults": True}
+
+    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), primary_key=True)
+    input_id = Column(BigInteger, ForeignKey('input.id'), primary_key=True)
+    stock = Column(Numeric(16, 3), nullable=False)
+    # Consumo (salidas) medio diario en la ventana y su tendencia (variación del consumo por día)
+    avg_daily_consumption = Column(Float, nullable=False)
+    trend = Column(Float, nullable=False)
+    # Días hasta agotar las existencias al consumo medio; NULL si no hay consumo
+    days_to_stockout = Column(Float, nullable=True)
+
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, BigInteger, Numeric, DateTime, func, ForeignKey, Index
+from app.core.db.session import Base
+
+class StockLevel(Base):
+    """Existencias actuales por (almacén, insumo), mantenidas por deltas en crud.inventory."""
+    __tablename__ = "stock_level"
+    __table_args__ = (Index("ix_stock_level_input", "input_id"),)
+
+    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), primary_key=True)
+    input_id = Column(BigInteger, ForeignKey('input.id'), primary_key=True)
+    quantity = Column(Numeric(16, 3), nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class StockCheckpoint(Base):
+    """
+    Existencias de (almacén, insumo) antes de `as_of`: suma de los movimientos con
+    created_at < as_of. Solo se guarda para los pares con movimientos en el periodo.
+    """
+    __tablename__ = "stock_checkpoint"
+
+    warehouse_id = Column(BigInteger, ForeignKey('warehouse.id'), primary_key=True)
+    input_id = Column(BigInteger, ForeignKey('input.id'), primary_key=True)
+    as_of = Column(DateTime(timezone=True), primary_key=True)
+    quantity = Column(Numeric(16, 3), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,11 +1,11 @@
-from sqlalchemy import Column, BigInteger, String, Boolean
+from sqlalchemy import Column, BigInteger, String, Boolean, Integer
 from sqlalchemy.orm import relationship
-from app.core.db.session import Base
+from app.core.db.session import Base, BigIntegerPK
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     name = Column(String(50), unique=True, index=True, nullable=False)
     password = Column(String(255), nullable=False)
     mail = Column(String(255), unique=True, index=True, nullable=False)
@@ -13,5 +13,9 @@ class User(Base):
     phone = Column(String(20), nullable=True)
     cargo = Column(String(50), nullable=True)
     is_admin = Column(Boolean, default=False, nullable=False)
+    # Se incrementa para revocar los tokens emitidos (cambio de contraseña, permisos o nombre)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
-    inventory = relationship("Inventory", back_populates="user")
\ No newline at end of file
+    # passive_deletes: no se cargan ni se anulan los movimientos al eliminar; la clave foránea
+    # rechaza eliminar un registro con movimientos (ver crud)
+    inventory = relationship("Inventory", back_populates="user", passive_deletes=True)
\ No newline at end of file
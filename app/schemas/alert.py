@@ -0,0 +1,44 @@
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+
+from app.schemas.inventory import QUANTITY_SCALE
+
+
+# Existencia mínima por almacén e insumo
+class StockThresholdSet(BaseModel):
+    warehouse_id: int = Field(..., gt=0)
+    input_id: int = Field(..., gt=0)
+    minimum: Decimal = Field(..., ge=0, max_digits=16, decimal_places=3)
+
+    @field_validator("minimum")
+    @classmethod
+    def scale_minimum(cls, value: Decimal) -> Decimal:
+        return value.quantize(QUANTITY_SCALE)
+
+
+class StockThresholdResponse(StockThresholdSet):
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Filtros de umbrales y alertas
+class AlertFilter(BaseModel):
+    warehouse_id: Optional[int] = Field(None, gt=0)
+    input_id: Optional[int] = Field(None, gt=0)
+
+
+class StockAlertResponse(BaseModel):
+    warehouse_id: int
+    input_id: int
+    quantity: Decimal
+    minimum: Decimal
+    notified_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
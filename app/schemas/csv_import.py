@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class CsvImportError(BaseModel):
+    row: int  # número de línea en el archivo (la cabecera es la 1)
+    error: str
+
+
+class CsvImportResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[CsvImportError] = []
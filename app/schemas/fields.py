@@ -0,0 +1,37 @@
+import functools
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_validator
+from typing import ClassVar, Optional
+
+
+# Campos de la respuesta a incluir (sparse fieldsets)
+class FieldsParams(BaseModel):
+    # Esquema de respuesta contra el que se validan los campos (lo define cada subclase)
+    fields_schema: ClassVar[type] = None
+
+    fields: Optional[str] = Field(None, description="Campos de la respuesta separados por comas (por defecto, todos)")
+
+    @field_validator("fields")
+    @classmethod
+    def check_fields(cls, value):
+        if value is None:
+            return value
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = sorted(names - cls.fields_schema.model_fields.keys())
+        if unknown:
+            raise ValueError(f"Campos desconocidos en fields: {', '.join(unknown)} (valores: {', '.join(cls.fields_schema.model_fields)})")
+        # En el orden del esquema, para que cada combinación tenga un único modelo en caché
+        return ",".join(name for name in cls.fields_schema.model_fields if name in names) or None
+
+    @property
+    def field_names(self) -> Optional[tuple]:
+        return tuple(self.fields.split(",")) if self.fields else None
+
+
+@functools.lru_cache(maxsize=256)
+def sparse_model(schema, names: tuple) -> type:
+    """Modelo de respuesta con solo los campos `names` de `schema` (mismos tipos y restricciones)."""
+    return create_model(
+        f"{schema.__name__}_{'_'.join(names)}",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names},
+    )
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import ClassVar, Literal, Optional
 from datetime import datetime
 
+from app.schemas.fields import FieldsParams
+from app.schemas.pagination import PageParams
+
 
 # Base
 class InputBase(BaseModel):
@@ -31,3 +34,14 @@ class InputResponse(InputBase):
 
     class Config:
         from_attributes = True
+
+
+# Campos a incluir en la respuesta (`fields=`)
+class InputFields(FieldsParams):
+    fields_schema: ClassVar[type] = InputResponse
+
+
+# Filtros y orden del listado
+class InputFilter(InputFields, PageParams):
+    name: Optional[str] = Field(None, max_length=50, description="Prefijo del nombre")
+    sort: Literal["id", "-id", "name", "-name", "created_at", "-created_at"] = "id"
@@ -1,7 +1,42 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+import re
+from decimal import Decimal
+from pydantic import BaseModel, Field, field_validator, model_validator
+from sqlalchemy import inspect
+from typing import ClassVar, List, Literal, Optional
 from datetime import datetime
 
+from app.core.db.config import settings
+from app.schemas.fields import FieldsParams
+from app.schemas.input import InputResponse
+from app.schemas.pagination import PageParams
+from app.schemas.user import UserResponse
+from app.schemas.warehouse import WarehouseResponse
+
+# Relaciones que se pueden incluir con `expand`
+EXPAND_RELATIONS = ("input", "warehouse", "user")
+
+QUANTITY_SCALE = Decimal("0.001")  # Numeric(14, 3)
+QUANTITY_LIMIT = Decimal("1e11")  # Numeric(14, 3): como mucho 11 dígitos enteros
+QUANTITY_PATTERN = re.compile(r"\s*([+-]?\d+(?:[.,]\d+)?)")
+
+
+def parse_quantity(amount: Optional[str]) -> Optional[Decimal]:
+    """Cantidad numérica de `amount` ('10', '2,5', '3.75 kg'); None si no empieza por un número."""
+    match = QUANTITY_PATTERN.match(amount or "")
+    return Decimal(match.group(1).replace(",", ".")) if match else None
+
+
+def column_quantity(quantity: Decimal) -> Decimal:
+    """
+    `quantity` con la escala de la columna (Numeric(14, 3)). ValueError si es negativa o no
+    cabe en la columna: el tipo de movimiento lo indica `is_input`, no el signo.
+    """
+    if quantity < 0:
+        raise ValueError("La cantidad no puede ser negativa")
+    if quantity >= QUANTITY_LIMIT or quantity.quantize(QUANTITY_SCALE) >= QUANTITY_LIMIT:
+        raise ValueError("La cantidad no puede tener más de 11 dígitos enteros")
+    return quantity.quantize(QUANTITY_SCALE)
+
 
 # Base
 class InventoryBase(BaseModel):
@@ -10,11 +45,42 @@ class InventoryBase(BaseModel):
     user_id: int = Field(..., gt=0)
     is_input: bool = Field(default=True)
     amount: str = Field(..., max_length=50)
+    # Si no se envía, se obtiene de `amount`
+    quantity: Optional[Decimal] = Field(None, ge=0, max_digits=14, decimal_places=3)
 
 
 # Crear
 class InventoryCreate(InventoryBase):
-    pass
+    @model_validator(mode="after")
+    def set_quantity(self):
+        if self.quantity is None:
+            self.quantity = parse_quantity(self.amount)
+            if self.quantity is None:
+                raise ValueError("La cantidad debe ser numérica")
+        # Misma escala que la columna, para responder igual que al leerla de la base de datos
+        self.quantity = column_quantity(self.quantity)
+        return self
+
+
+# Crear por lotes
+class InventoryBatch(BaseModel):
+    # all_or_nothing: si algún movimiento falla no se registra ninguno; best_effort: se registran los válidos
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+    items: List[InventoryCreate] = Field(..., min_length=1, max_length=settings.INVENTORY_BATCH_MAX)
+
+
+class InventoryBatchItemResult(BaseModel):
+    index: int
+    created: bool
+    # Solo si la base de datos devuelve los ids de un INSERT múltiple (no en MySQL)
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class InventoryBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[InventoryBatchItemResult]
 
 
 # Actualizar
@@ -24,6 +90,20 @@ class InventoryUpdate(BaseModel):
     user_id: Optional[int] = Field(None, gt=0)
     is_input: Optional[bool] = Field(None)
     amount: Optional[str] = Field(None, max_length=50)
+    quantity: Optional[Decimal] = Field(None, ge=0, max_digits=14, decimal_places=3)
+
+    @model_validator(mode="after")
+    def set_quantity(self):
+        if self.amount is not None and self.quantity is None:
+            self.quantity = parse_quantity(self.amount)
+            if self.quantity is None:
+                raise ValueError("La cantidad debe ser numérica")
+        if self.quantity is not None:
+            self.quantity = column_quantity(self.quantity)
+            if self.amount is None:
+                # Solo se envía la cantidad: `amount` se deriva de ella para que no queden distintas
+                self.amount = f"{self.quantity.normalize():f}"
+        return self
 
 
 # Respuesta
@@ -34,3 +114,92 @@ class InventoryResponse(InventoryBase):
 
     class Config:
         from_attributes = True
+
+
+# Respuesta con las relaciones pedidas en `expand`
+class InventoryExpandedResponse(InventoryResponse):
+    input: Optional[InputResponse] = None
+    warehouse: Optional[WarehouseResponse] = None
+    user: Optional[UserResponse] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def loaded_only(cls, data):
+        # Solo las relaciones ya cargadas: leer las demás haría una consulta por fila.
+        # Las omitidas quedan sin asignar y no aparecen con `response_model_exclude_unset`.
+        if isinstance(data, dict):
+            return data
+        state = inspect(data, raiseerr=False)
+        if state is None:
+            return data
+        return {key: getattr(data, key) for key in cls.model_fields if key not in state.unloaded}
+
+
+# Relaciones a incluir en la respuesta (almacén, insumo y usuario en lugar de solo sus ids)
+class InventoryExpand(BaseModel):
+    expand: Optional[str] = Field(None, description="Relaciones separadas por comas: input, warehouse, user")
+
+    @field_validator("expand")
+    @classmethod
+    def check_expand(cls, value):
+        if value is None:
+            return value
+        relations = [relation.strip() for relation in value.split(",") if relation.strip()]
+        unknown = [relation for relation in relations if relation not in EXPAND_RELATIONS]
+        if unknown:
+            raise ValueError(f"Relación desconocida en expand: {', '.join(unknown)} (valores: {', '.join(EXPAND_RELATIONS)})")
+        return ",".join(dict.fromkeys(relations))
+
+    @property
+    def relations(self) -> list:
+        # Con `fields`, se incluyen las relaciones nombradas en él (aunque no estén en expand)
+        fields = getattr(self, "field_names", None)
+        if fields:
+            return [relation for relation in EXPAND_RELATIONS if relation in fields]
+        return self.expand.split(",") if self.expand else []
+
+
+# Campos a incluir en la respuesta (`fields=`); las relaciones también se pueden nombrar
+class InventoryFields(FieldsParams):
+    fields_schema: ClassVar[type] = InventoryExpandedResponse
+
+
+# Parámetros del detalle de un movimiento
+class InventoryDetail(InventoryExpand, InventoryFields):
+    pass
+
+
+# Filtros de movimientos (comunes al listado y a la exportación)
+class InventoryFilterBase(BaseModel):
+    warehouse_id: Optional[int] = Field(None, gt=0)
+    input_id: Optional[int] = Field(None, gt=0)
+    user_id: Optional[int] = Field(None, gt=0)
+    is_input: Optional[bool] = None
+    created_from: Optional[datetime] = Field(None, description="Fecha inicial (incluida)")
+    created_to: Optional[datetime] = Field(None, description="Fecha final (excluida)")
+
+
+# Filtros y orden del listado
+class InventoryFilter(InventoryFilterBase, InventoryDetail, PageParams):
+    sort: Literal["id", "-id", "created_at", "-created_at"] = "id"
+
+
+# Exportación
+class InventoryExport(InventoryFilterBase):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+
+# Saldo (existencias) por almacén e insumo
+class BalanceFilter(BaseModel):
+    warehouse_id: Optional[int] = Field(None, gt=0)
+    input_id: Optional[int] = Field(None, gt=0)
+    as_of: Optional[datetime] = Field(None, description="Existencias a esta fecha (movimientos con created_at <= as_of)")
+
+
+class StockBalance(BaseModel):
+    warehouse_id: int
+    input_id: int
+    quantity: Decimal
+
+    class Config:
+        from_attributes = True
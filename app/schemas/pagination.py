@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from app.core.db.config import settings
+
+
+# Parámetros de página (paginación por cursor)
+class PageParams(BaseModel):
+    limit: int = Field(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX)
+    cursor: Optional[str] = Field(None, description="Valor de X-Next-Cursor de la página anterior")
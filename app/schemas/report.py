@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+# Filtros del reporte de movimientos por periodo
+class MovementReportFilter(BaseModel):
+    bucket: Literal["day", "week", "month"] = "day"
+    group_by: Literal["warehouse", "input", "warehouse_input"] = "warehouse_input"
+    warehouse_id: Optional[int] = Field(None, gt=0)
+    input_id: Optional[int] = Field(None, gt=0)
+    created_from: Optional[datetime] = Field(None, description="Fecha inicial (incluida)")
+    created_to: Optional[datetime] = Field(None, description="Fecha final (excluida)")
+    # Post-proceso por serie (almacén/insumo), sobre los periodos con movimientos
+    running: bool = Field(False, description="Incluir el saldo acumulado (running_net)")
+    moving_average: Optional[int] = Field(None, ge=2, le=366, description="Ventana de la media móvil del neto, en periodos")
+
+
+class MovementBucket(BaseModel):
+    bucket: date  # inicio del periodo (lunes en las semanas, día 1 en los meses)
+    warehouse_id: Optional[int] = None
+    input_id: Optional[int] = None
+    quantity_in: Decimal
+    quantity_out: Decimal
+    net: Decimal
+    movements: int
+    running_net: Optional[Decimal] = None
+    moving_average_net: Optional[Decimal] = None
+
+
+# Pronóstico de consumo
+class ForecastFilter(BaseModel):
+    warehouse_id: Optional[int] = Field(None, gt=0)
+    input_id: Optional[int] = Field(None, gt=0)
+
+
+class ForecastPair(BaseModel):
+    warehouse_id: int = Field(..., gt=0)
+    input_id: int = Field(..., gt=0)
+
+
+class StockForecastResponse(BaseModel):
+    warehouse_id: int
+    input_id: int
+    stock: Decimal
+    avg_daily_consumption: float
+    trend: float
+    days_to_stockout: Optional[float] = None
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
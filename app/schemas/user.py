@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import ClassVar, Literal, Optional
+
+from app.schemas.fields import FieldsParams
+from app.schemas.pagination import PageParams
 
 
 # Base para todos los esquemas
@@ -37,6 +40,16 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+# Usuario autenticado (lo que necesitan las dependencias de seguridad)
+class UserPrincipal(BaseModel):
+    id: int
+    name: str
+    is_admin: bool
+
+    class Config:
+        from_attributes = True
+
+
 # Esquema para login
 class UserLogin(BaseModel):
     name: str
@@ -47,3 +60,14 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+
+
+# Campos a incluir en la respuesta (`fields=`)
+class UserFields(FieldsParams):
+    fields_schema: ClassVar[type] = UserResponse
+
+
+# Filtros y orden del listado
+class UserFilter(UserFields, PageParams):
+    name: Optional[str] = Field(None, max_length=50, description="Prefijo del nombre")
+    sort: Literal["id", "-id", "name", "-name"] = "id"
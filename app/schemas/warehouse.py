@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import ClassVar, Literal, Optional
 from datetime import datetime
 
+from app.schemas.fields import FieldsParams
+from app.schemas.pagination import PageParams
+
 
 # Base
 class WarehouseBase(BaseModel):
@@ -28,3 +31,14 @@ class WarehouseResponse(WarehouseBase):
 
     class Config:
         from_attributes = True
+
+
+# Campos a incluir en la respuesta (`fields=`)
+class WarehouseFields(FieldsParams):
+    fields_schema: ClassVar[type] = WarehouseResponse
+
+
+# Filtros y orden del listado
+class WarehouseFilter(WarehouseFields, PageParams):
+    name: Optional[str] = Field(None, max_length=50, description="Prefijo del nombre")
+    sort: Literal["id", "-id", "name", "-name", "created_at", "-created_at"] = "id"
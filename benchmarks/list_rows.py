@@ -0,0 +1,107 @@
+"""
+Compara el listado de inventario con instancias del ORM frente a tuplas de columnas.
+
+Mide, para cada camino, filas por segundo y memoria máxima (tracemalloc) de:
+consulta + validación con el esquema de respuesta + serialización a JSON, como en
+GET /inventories/. Usa una base SQLite en memoria propia (no toca la configurada).
+
+Uso:
+    python -m benchmarks.list_rows [--rows 50000] [--repeat 5]
+"""
+import argparse
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.db.session import Base
+from app.crud.inventory import get_inventories
+from app.crud.pagination import keyset_paginate
+from app.models.inventory import Inventory
+from app.schemas.inventory import InventoryExpandedResponse, InventoryFilter
+# Registrar todos los modelos (relaciones entre ellos)
+from app.models import input, inventory, user, warehouse  # noqa: F401
+
+response_adapter = TypeAdapter(List[InventoryExpandedResponse])
+
+
+def orm_path(db: Session, filters: InventoryFilter):
+    # Camino anterior: instancias completas del ORM
+    return keyset_paginate(db.query(Inventory), Inventory, filters.sort, filters)
+
+
+def rows_path(db: Session, filters: InventoryFilter):
+    return get_inventories(db, filters)
+
+
+def serialize(items) -> bytes:
+    items = response_adapter.validate_python(items, from_attributes=True)
+    return response_adapter.dump_json(items, exclude_unset=True)
+
+
+def populate(engine, rows: int):
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Inventory),
+            [
+                {
+                    "input_id": 1 + i % 50,
+                    "warehouse_id": 1 + i % 5,
+                    "user_id": 1,
+                    "is_input": i % 3 != 0,
+                    "amount": str(1 + i % 20),
+                    "quantity": Decimal(1 + i % 20),
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def measure(engine, path, filters: InventoryFilter, repeat: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        with Session(engine) as db:
+            start = time.perf_counter()
+            items, _ = path(db, filters)
+            body = serialize(items)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    with Session(engine) as db:
+        tracemalloc.start()
+        items, _ = path(db, filters)
+        serialize(items)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"rows": len(items), "seconds": best, "bytes": len(body), "peak": peak}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Listado de inventario: ORM frente a tuplas de columnas.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    populate(engine, args.rows)
+    # Una sola página con todas las filas (sin el límite de PAGE_SIZE_MAX)
+    filters = InventoryFilter.model_construct(limit=args.rows)
+
+    print(f"{'camino':<8} {'filas':>8} {'filas/s':>12} {'ms':>10} {'memoria máx. (MiB)':>20}")
+    for name, path in (("orm", orm_path), ("rows", rows_path)):
+        result = measure(engine, path, filters, args.repeat)
+        print(
+            f"{name:<8} {result['rows']:>8} {result['rows'] / result['seconds']:>12,.0f} "
+            f"{result['seconds'] * 1000:>10.1f} {result['peak'] / 2**20:>20.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
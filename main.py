@@ -1,16 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from app.core.db.config import settings
 from app.core.db.init_db import init_db
+from app.core.db.session import connect_db, disconnect_db, replica_router
+from app.core.tasks import background_tasks
 from app.core.exception_handlers import (
     http_exception_handler,
     validation_exception_handler,
 )
 from app.core.middlewares import catch_exceptions_middleware, timeout_middleware
+from app.core.serialization import FastJSONResponse
 from app.api.v1.router import api_v1_router
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranque y parada de la aplicación (pool de conexiones y tareas en segundo plano)."""
+    await connect_db()
+    tasks = []
+    if replica_router.replicas:
+        tasks.append(asyncio.create_task(replica_router.monitor(settings.DB_REPLICA_CHECK_INTERVAL)))
+    tasks.extend(asyncio.create_task(task) for task in background_tasks())
+    yield
+    for task in tasks:
+        task.cancel()
+    await disconnect_db()
+
+
+# Con FAST_JSON las respuestas se escriben con orjson/pydantic-core en lugar de json.dumps
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse if settings.FAST_JSON else JSONResponse)
 
 origins = [
     "http://localhost:4200",  # URL del frontend Angular local
@@ -22,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 # Configuración de la base de datos
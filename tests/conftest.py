@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+import pytest
+
+# Configuración mínima antes de importar la aplicación: base SQLite propia y sin .env
+DATA_DIR = tempfile.mkdtemp(prefix="agro-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DATA_DIR}/agro.db",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_NAME": "test",
+    "SECRET_JTW": "test-secret",
+    "MAIL_USERNAME": "test",
+    "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "agro@example.com",
+    "MAIL_PORT": "25",
+    "MAIL_SERVER": "localhost",
+    "MAIL_STARTTLS": "false",
+    "MAIL_SSL_TLS": "false",
+    "USE_CREDENTIALS": "false",
+    "ADMIN_EMAIL": "admin@example.com",
+    "DB_POOL_WARMUP": "0",
+})
+
+from app.core.db.session import Base, SessionLocal, engine  # noqa: E402
+# Registrar todos los modelos (create_all y relaciones entre ellos)
+from app.models import catalog_version, email_outbox, input, inventory, stock_alert, stock_forecast, stock_level, user, warehouse  # noqa: E402,F401
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre una base recién creada (se recrean todas las tablas en cada prueba)."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        yield session
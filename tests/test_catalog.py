@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from app.crud.catalog import create_version_rows, input_catalog, warehouse_catalog
+from app.crud.pagination import paginate_rows
+from app.models.catalog_version import CatalogVersion
+from app.models.input import Input
+
+
+def versions(db) -> dict:
+    db.expire_all()
+    return dict(db.query(CatalogVersion.name, CatalogVersion.version))
+
+
+def test_version_rows_are_created_once(db):
+    create_version_rows(db.connection())
+    create_version_rows(db.connection())  # otro worker arrancando: no falla ni duplica
+    assert versions(db) == {"input": 0, "warehouse": 0, "movements": 0}
+
+
+def test_bump_increments_existing_row(db):
+    create_version_rows(db.connection())
+    input_catalog.bump(db)
+    input_catalog.bump(db)
+    db.commit()
+    assert versions(db) == {"input": 2, "warehouse": 0, "movements": 0}
+
+
+def test_bump_creates_missing_row(db):
+    warehouse_catalog.bump(db)
+    db.commit()
+    assert versions(db) == {"warehouse": 1}
+
+
+def test_paginate_rows_ignores_case_and_accents():
+    rows = [
+        SimpleNamespace(id=1, name="cafe"),
+        SimpleNamespace(id=2, name="Azúcar"),
+        SimpleNamespace(id=3, name="Café"),
+        SimpleNamespace(id=4, name="abono"),
+    ]
+    page = SimpleNamespace(cursor=None, limit=2)
+    first, cursor = paginate_rows(rows, Input, "name", page)
+    assert [row.id for row in first] == [4, 2]
+
+    second, cursor = paginate_rows(rows, Input, "name", SimpleNamespace(cursor=cursor, limit=2))
+    # 'Café' y 'cafe' empatan (como en utf8mb4_0900_ai_ci): se ordenan por id
+    assert [row.id for row in second] == [1, 3]
+    assert cursor is None
+
+
+def test_reload_queries_without_holding_the_lock(db, monkeypatch):
+    create_version_rows(db.connection())
+    db.add(Input(name="Urea", reference="r", state="s"))
+    input_catalog.bump(db)
+    db.commit()
+    monkeypatch.setattr(input_catalog, "state", (None, [], {}))
+
+    query = db.query
+    locked = []
+
+    def spy(*args, **kwargs):
+        locked.append(input_catalog._lock.locked())
+        return query(*args, **kwargs)
+
+    monkeypatch.setattr(db, "query", spy)
+    assert [row.name for row in input_catalog.all(db)] == ["Urea"]
+    assert input_catalog.version == 1
+    assert locked == [False, False]  # versión y filas se leen sin el lock
@@ -0,0 +1,42 @@
+from app.crud import csv_import
+from app.crud.catalog import create_version_rows
+from app.crud.input import import_inputs
+from app.models.input import Input
+
+
+def row(name, state):
+    return {"name": name, "reference": "r", "state": state}
+
+
+def names(db) -> list:
+    db.expire_all()
+    return sorted(name for (name,) in db.query(Input.name))
+
+
+def test_repeated_values_ignore_case_and_accents(db):
+    create_version_rows(db.connection())
+    result = import_inputs(db, [(2, row("Café", "s1")), (3, row("cafe", "s2")), (4, row("Urea", "S1"))], {})
+    assert result["created"] == 1
+    assert result["errors"] == [
+        {"row": 3, "error": "Valor de 'name' repetido en el archivo"},
+        {"row": 4, "error": "Valor de 'state' repetido en el archivo"},
+    ]
+    assert names(db) == ["Café"]
+
+
+def test_concurrent_conflict_only_rejects_its_row(db, monkeypatch):
+    create_version_rows(db.connection())
+    save = csv_import._save
+
+    def save_after_other_worker(db, *args):
+        # Otro worker inserta un estado del bloque entre las consultas y el guardado
+        monkeypatch.setattr(csv_import, "_save", save)
+        db.add(Input(name="Otro", reference="r", state="s2"))
+        db.commit()
+        return save(db, *args)
+
+    monkeypatch.setattr(csv_import, "_save", save_after_other_worker)
+    result = import_inputs(db, [(2, row("Urea", "s1")), (3, row("Abono", "s2")), (4, row("Cal", "s3"))], {})
+    assert result["created"] == 2
+    assert result["errors"] == [{"row": 3, "error": "Conflicto con otro registro al guardar; vuelva a importar la fila"}]
+    assert names(db) == ["Cal", "Otro", "Urea"]
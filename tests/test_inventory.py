@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from app.crud.catalog import create_version_rows
+from app.crud.inventory import create_inventory, update_inventory
+from app.models.input import Input
+from app.models.user import User
+from app.models.warehouse import Warehouse
+from app.schemas.inventory import InventoryCreate, InventoryUpdate
+
+
+@pytest.mark.parametrize(
+    "quantity, amount",
+    [(Decimal("3"), "3"), (Decimal("2.50"), "2.5"), (Decimal("100"), "100"), (Decimal("0.125"), "0.125")],
+)
+def test_update_with_only_quantity_derives_amount(quantity, amount):
+    update = InventoryUpdate(quantity=quantity)
+    assert (update.amount, update.quantity) == (amount, quantity.quantize(Decimal("0.001")))
+
+
+def test_update_keeps_amount_when_both_are_sent():
+    update = InventoryUpdate(amount="2,5 kg", quantity=Decimal("2.5"))
+    assert (update.amount, update.quantity) == ("2,5 kg", Decimal("2.500"))
+
+
+@pytest.mark.parametrize("quantity", [Decimal("-1"), Decimal("100000000000")])
+def test_update_rejects_quantities_out_of_range(quantity):
+    with pytest.raises(ValidationError):
+        InventoryUpdate(quantity=quantity)
+
+
+def test_put_with_only_quantity_updates_amount(db):
+    create_version_rows(db.connection())
+    db.add_all([
+        Input(name="Urea", reference="r", state="s"),
+        Warehouse(name="Central", reference="r"),
+        User(name="ana", password="x", mail="ana@example.com", identification="1", cargo="c"),
+    ])
+    db.commit()
+    created = create_inventory(db, InventoryCreate(input_id=1, warehouse_id=1, user_id=1, amount="2,5 kg"))
+
+    updated = update_inventory(db, created.id, InventoryUpdate(quantity=Decimal("4")))
+    assert (updated.amount, updated.quantity) == ("4", Decimal("4.000"))
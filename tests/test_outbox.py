@@ -0,0 +1,155 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+aiosmtpd = pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from app.core.db.config import settings  # noqa: E402
+from app.core.email import OutboxSender  # noqa: E402
+from app.crud.outbox import enqueue_email  # noqa: E402
+from app.models.email_outbox import EmailOutbox  # noqa: E402
+
+
+class Handler:
+    """Servidor SMTP de prueba: guarda los mensajes o responde con el código indicado."""
+
+    def __init__(self):
+        self.messages = []
+        self.rcpt_reply = None  # p. ej. "550 ..." rechaza el destinatario (permanente)
+        self.data_reply = None  # p. ej. "451 ..." falla temporal al enviar
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.rcpt_reply:
+            return self.rcpt_reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.data_reply:
+            return self.data_reply
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    handler = Handler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_PORT", str(port))
+    monkeypatch.setattr(settings, "OUTBOX_BACKOFF_BASE", 30)
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+    yield handler
+    controller.stop()
+
+
+def send_batch():
+    async def run():
+        sender = OutboxSender()
+        try:
+            return await sender.send_batch()
+        finally:
+            await sender.close()
+
+    return asyncio.run(run())
+
+
+def make_due(db):
+    """Adelanta el próximo intento de los pendientes (simula que pasó la espera)."""
+    db.query(EmailOutbox).update({EmailOutbox.next_attempt_at: datetime(2000, 1, 1)})
+    db.commit()
+
+
+def test_send_deletes_sent_emails(db, smtp):
+    enqueue_email(db, "Uno", ["a@example.com"], "<p>1</p>")
+    enqueue_email(db, "Dos", ["b@example.com", "c@example.com"], "<p>2</p>")
+    db.commit()
+
+    assert send_batch() is False  # lote incompleto: no hay más pendientes
+    assert sorted(tuple(m.rcpt_tos) for m in smtp.messages) == [("a@example.com",), ("b@example.com", "c@example.com")]
+    db.expire_all()
+    assert db.query(EmailOutbox).count() == 0
+
+
+def test_transient_failure_is_retried_with_backoff(db, smtp):
+    smtp.data_reply = "451 4.3.0 Try again later"
+    enqueue_email(db, "Uno", ["a@example.com"], "<p>1</p>")
+    db.commit()
+
+    delays = []
+    for attempt in (1, 2):
+        before = datetime.now(timezone.utc).replace(tzinfo=None)  # now() de SQLite es UTC
+        send_batch()
+        db.expire_all()
+        email = db.query(EmailOutbox).one()
+        assert (email.status, email.attempts) == ("pending", attempt)
+        assert "Try again" in email.last_error
+        delays.append(email.next_attempt_at - before)
+        make_due(db)
+
+    # Espera exponencial: OUTBOX_BACKOFF_BASE y luego el doble (margen por el reloj de SQLite, en segundos)
+    assert timedelta(seconds=28) <= delays[0] <= timedelta(seconds=32)
+    assert timedelta(seconds=58) <= delays[1] <= timedelta(seconds=62)
+
+    smtp.data_reply = None
+    send_batch()
+    db.expire_all()
+    assert db.query(EmailOutbox).count() == 0
+    assert len(smtp.messages) == 1
+
+
+def test_dead_letter_after_max_attempts(db, smtp):
+    smtp.data_reply = "451 4.3.0 Try again later"
+    enqueue_email(db, "Uno", ["a@example.com"], "<p>1</p>")
+    db.commit()
+
+    for _ in range(settings.OUTBOX_MAX_ATTEMPTS):
+        send_batch()
+        make_due(db)
+
+    db.expire_all()
+    email = db.query(EmailOutbox).one()
+    assert (email.status, email.attempts) == ("dead", settings.OUTBOX_MAX_ATTEMPTS)
+    # Los descartados no se vuelven a tomar
+    assert send_batch() is False
+    assert smtp.messages == []
+
+
+def test_refused_recipient_is_dead_immediately(db, smtp):
+    smtp.rcpt_reply = "550 5.1.1 No such user"
+    enqueue_email(db, "Uno", ["nobody@example.com"], "<p>1</p>")
+    db.commit()
+
+    send_batch()
+    db.expire_all()
+    email = db.query(EmailOutbox).one()
+    assert (email.status, email.attempts) == ("dead", 1)
+    assert "No such user" in email.last_error
+
+
+def test_run_survives_unexpected_errors(monkeypatch):
+    calls = []
+
+    async def send_batch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("fallo inesperado")
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(settings, "OUTBOX_POLL_INTERVAL", 0)
+    sender = OutboxSender()
+    monkeypatch.setattr(sender, "send_batch", send_batch)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(sender.run())
+    assert len(calls) == 2
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from starlette.requests import Request
+
+from app.core.db.replicas import ReplicaRouter
+from app.core.db.session import get_read_db, make_replica
+
+
+def request(method="GET", token="user-a"):
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234),
+    })
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    """Dos réplicas SQLite locales como sustitutos de las réplicas MySQL."""
+    replicas = [make_replica(index, f"sqlite:///{tmp_path}/replica-{index}.db") for index in range(2)]
+    yield replicas
+    for replica in replicas:
+        replica.engine.dispose()
+
+
+def route_names(router, count, **kwargs):
+    names = []
+    for _ in range(count):
+        replica = router.route(request(**kwargs))
+        names.append(replica.name if replica else None)
+    return names
+
+
+def test_round_robin_alternates_replicas(replicas):
+    router = ReplicaRouter(replicas, strategy="round_robin")
+    assert route_names(router, 4) == ["replica-0", "replica-1", "replica-0", "replica-1"]
+
+
+def test_least_connections_picks_replica_with_fewest_sessions(replicas):
+    router = ReplicaRouter(replicas, strategy="least_connections")
+    first = router.route(request())
+    second = router.route(request())
+    assert {first.name, second.name} == {"replica-0", "replica-1"}
+
+    router.release(second)
+    # La réplica de `first` sigue con una sesión abierta: la siguiente va a la otra
+    assert route_names(router, 1) == [second.name]
+    assert (first.in_flight, second.in_flight) == (1, 1)
+
+
+def test_reads_after_a_write_stick_to_the_primary(replicas, monkeypatch):
+    router = ReplicaRouter(replicas, sticky_seconds=5)
+    now = [1000.0]
+    monkeypatch.setattr("app.core.db.replicas.time.monotonic", lambda: now[0])
+
+    assert router.route(request("POST")) is None  # las escrituras siempre van al primario
+    assert router.route(request()) is None  # mismo cliente, dentro de la ventana
+    assert router.route(request(token="user-b")) is not None  # otros clientes siguen en réplicas
+
+    now[0] += 5
+    assert router.route(request()) is not None  # ventana vencida
+
+
+def test_concurrent_writes_keep_every_sticky_mark(replicas):
+    router = ReplicaRouter(replicas, sticky_seconds=60)
+    clients = [f"user-{index}" for index in range(3000)]  # supera el límite que dispara la limpieza
+
+    def write_then_read(token):
+        router.route(request("POST", token))
+        router.route(request(token=f"reader-{token}"))
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(write_then_read, clients))
+    # Ninguna marca se pierde al reconstruir el diccionario mientras otros hilos escriben
+    assert all(router.route(request(token=token)) is None for token in clients)
+
+
+def test_unhealthy_replicas_leave_rotation(replicas, tmp_path):
+    # La segunda réplica apunta a un directorio inexistente: la comprobación falla al conectar
+    broken = make_replica(2, f"sqlite:///{tmp_path}/missing/replica.db")
+    router = ReplicaRouter([replicas[0], broken])
+    router.check()
+
+    assert [r["healthy"] for r in router.status()] == [True, False]
+    assert router.status()[1]["error"]
+    assert route_names(router, 3) == ["replica-0"] * 3
+
+    router.replicas = [broken]
+    assert router.route(request()) is None  # sin réplicas sanas: primario
+
+
+def test_read_session_uses_replica_and_releases_it(replicas, monkeypatch):
+    router = ReplicaRouter(replicas)
+    monkeypatch.setattr("app.core.db.session.replica_router", router)
+
+    dependency = get_read_db(request(), db="primary")
+    session = next(dependency)
+    assert session.get_bind() is replicas[0].engine
+    assert replicas[0].in_flight == 1
+    dependency.close()
+    assert replicas[0].in_flight == 0
+
+    dependency = get_read_db(request("POST"), db="primary")
+    assert next(dependency) == "primary"
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from app.core.db.session import SessionLocal
+from app.crud.catalog import create_version_rows
+from app.crud.inventory import create_inventory
+from app.crud.report import get_movement_report, report_cache
+from app.models.input import Input
+from app.models.user import User
+from app.models.warehouse import Warehouse
+from app.schemas.inventory import InventoryCreate
+from app.schemas.report import MovementReportFilter
+
+
+def movement(amount: str) -> InventoryCreate:
+    return InventoryCreate(input_id=1, warehouse_id=1, user_id=1, is_input=True, amount=amount)
+
+
+def test_movement_in_another_worker_changes_the_report_key(db):
+    create_version_rows(db.connection())
+    db.add_all([
+        Input(name="Urea", reference="r", state="s"),
+        Warehouse(name="Central", reference="r"),
+        User(name="ana", password="x", mail="ana@example.com", identification="1", cargo="c"),
+    ])
+    db.commit()
+    report_cache.clear()
+    create_inventory(db, movement("10"))
+    filters = MovementReportFilter()
+    assert [row["net"] for row in get_movement_report(db, filters)] == [Decimal("10.000")]
+
+    # Otro worker registra un movimiento: solo incrementa la versión en la base de datos
+    with SessionLocal() as other:
+        create_inventory(other, movement("5"))
+    assert report_cache.stats()["size"] == 1
+
+    assert [row["net"] for row in get_movement_report(db, filters)] == [Decimal("15.000")]
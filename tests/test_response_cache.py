@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.db.config import settings
+from app.core.response_cache import MemoryStore, response_cache
+from app.core.security import hash_password
+from app.crud.catalog import catalogs
+from app.models.catalog_version import CatalogVersion
+from app.models.input import Input
+from app.models.user import User
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    import main
+
+    # Estado de cada proceso: caché de respuestas y copias de los catálogos vacías
+    monkeypatch.setattr(response_cache, "store", MemoryStore(maxsize=64, ttl=60))
+    monkeypatch.setattr(response_cache, "routes", {})
+    for catalog in catalogs.values():
+        monkeypatch.setattr(catalog, "state", (None, [], {}))
+    monkeypatch.setattr(settings, "CATALOG_POLL_INTERVAL", 0)
+
+    db.add(User(name="admin", password=hash_password("secret123"), mail="admin@example.com", identification="1", is_admin=True))
+    db.commit()
+    client = TestClient(main.app)  # sin lifespan: no arranca las tareas en segundo plano
+    token = client.post("/api/v1/auth/login", json={"name": "admin", "password": "secret123"}).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
+
+
+def test_write_in_another_worker_changes_the_key(client, db):
+    assert client.post("/api/v1/inputs/", json={"name": "Urea", "reference": "r1", "state": "s1"}).status_code == 201
+    assert client.get("/api/v1/inputs/").json()[0]["reference"] == "r1"
+    assert client.get("/api/v1/inputs/").json()[0]["reference"] == "r1"
+    assert response_cache.stats()["routes"]["inputs"]["hits"] == 1
+
+    # Otro worker actualiza el insumo: incrementa catalog_version, pero no toca la caché de este proceso
+    db.query(Input).update({Input.reference: "r2"})
+    db.query(CatalogVersion).filter(CatalogVersion.name == "input").update({CatalogVersion.version: CatalogVersion.version + 1})
+    db.commit()
+
+    assert client.get("/api/v1/inputs/").json()[0]["reference"] == "r2"
+
+
+def test_cached_body_matches_standard_path(client, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON", False)
+    client.post("/api/v1/warehouses/", json={"name": "Almacén ñ", "reference": "r"})
+
+    cached = client.get("/api/v1/warehouses/?limit=5")
+    assert client.get("/api/v1/warehouses/?limit=5").content == cached.content
+    assert response_cache.stats()["routes"]["warehouses"]["hits"] == 1
+
+    monkeypatch.setattr(response_cache, "store", None)  # sin caché: serialización estándar de FastAPI
+    assert client.get("/api/v1/warehouses/?limit=5").content == cached.content
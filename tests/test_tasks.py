@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.core import tasks
+
+
+def run_until(func, calls: int) -> list:
+    """Ejecuta `run_periodically(func)` hasta la llamada número `calls` y retorna las llamadas."""
+    seen = []
+
+    def wrapped():
+        seen.append(1)
+        if len(seen) == calls:
+            raise asyncio.CancelledError
+        func()
+
+    wrapped.__name__ = func.__name__
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(tasks.run_periodically(wrapped, 0))
+    return seen
+
+
+def test_forecast_task_survives_unexpected_errors(monkeypatch):
+    def refresh_forecasts(db):
+        raise ValueError("serie vacía")
+
+    monkeypatch.setattr(tasks, "forecasts_stale", lambda db: True)
+    monkeypatch.setattr(tasks, "refresh_forecasts", refresh_forecasts)
+    assert len(run_until(tasks.refresh_stock_forecasts, 3)) == 3
+
+
+def test_checkpoint_task_survives_unexpected_errors(monkeypatch):
+    def build_checkpoint(db, as_of):
+        raise TypeError("fecha sin zona horaria")
+
+    monkeypatch.setattr(tasks, "checkpoint_boundary", lambda db, interval, settle: None)
+    monkeypatch.setattr(tasks, "build_checkpoint", build_checkpoint)
+    assert len(run_until(tasks.build_stock_checkpoints, 3)) == 3
+
+
+def test_alert_digest_task_survives_unexpected_errors(monkeypatch):
+    def queue_alert_digest(db):
+        raise KeyError("warehouse")
+
+    monkeypatch.setattr(tasks, "queue_alert_digest", queue_alert_digest)
+    assert len(run_until(tasks.send_alert_digest, 3)) == 3
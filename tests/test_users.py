@@ -0,0 +1,18 @@
+from app.core import security
+from app.core.db.session import SessionLocal
+from app.crud.user import get_token_version, update_user
+from app.models.user import User
+from app.schemas.user import UserUpdate
+
+
+def test_concurrent_updates_both_bump_token_version(db):
+    db.add(User(name="ana", password="x", mail="ana@example.com", identification="1", cargo="c"))
+    db.commit()
+
+    with SessionLocal() as other:
+        stale = other.query(User).one()  # otra petición ya leyó token_version = 0
+        update_user(db, stale.id, UserUpdate(cargo=None, is_admin=True))
+        update_user(other, stale.id, UserUpdate(cargo=None, password="nueva123"), hashed_password="y")
+
+    assert get_token_version(db, stale.id) == 2
+    assert security.token_version_cache.get(stale.id) == 2